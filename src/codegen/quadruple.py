@@ -91,7 +91,7 @@ class QuadOp(str, Enum):
     ADDR = "ADDR"          # (ADDR, symbol, None, result)       -> result = &symbol (opcional)
 
 
-@dataclass
+@dataclass(slots=True)
 class Quadruple:
     """
     Representa un cuádruplo de código intermedio.
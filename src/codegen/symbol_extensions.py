@@ -5,6 +5,11 @@ Este módulo agrega información de codegen a los símbolos sin modificar el mó
 from typing import Optional, Dict
 from dataclasses import dataclass, field
 
+try:
+    from semantic.types import INT, FLOAT, BOOL, STR, NULL, VOID
+except ImportError:
+    from ..semantic.types import INT, FLOAT, BOOL, STR, NULL, VOID
+
 # Diccionarios globales para almacenar información de codegen por símbolo
 _symbol_codegen_info: Dict[int, 'CodegenInfo'] = {}
 
@@ -92,25 +97,18 @@ def mark_as_temporal(symbol):
     info.es_temporal = True
 
 
+# Tamaño en bytes por tipo; cualquier otro (arreglo, clase o desconocido) es un puntero de 4 bytes
+_SIZE_TABLE = {
+    INT: 4, FLOAT: 4, BOOL: 4,  # tipos básicos
+    STR: 4,   # puntero a string
+    NULL: 4,  # null pointer
+    VOID: 0,  # void no ocupa espacio
+}
+
+
 def get_type_size(type_str):
     """
     Retorna el tamaño en bytes de un tipo.
     Útil para calcular offsets en registros de activación.
     """
-    # Importar tipos desde semantic.types
-    from semantic.types import INT, FLOAT, BOOL, STR, NULL, VOID, is_array, is_class
-    
-    if type_str in (INT, FLOAT, BOOL):
-        return 4  # 4 bytes para tipos básicos
-    elif type_str == STR:
-        return 4  # 4 bytes para puntero a string
-    elif is_array(type_str):
-        return 4  # 4 bytes para puntero a array
-    elif is_class(type_str):
-        return 4  # 4 bytes para puntero a objeto
-    elif type_str == NULL:
-        return 4  # 4 bytes para null pointer
-    elif type_str == VOID:
-        return 0  # void no ocupa espacio
-    else:
-        return 4  # Default: 4 bytes
+    return _SIZE_TABLE.get(type_str, 4)  # Default (arreglos, clases, etc.): 4 bytes
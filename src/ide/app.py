@@ -380,7 +380,7 @@ if run_now or (auto_compile and st.session_state.code.strip()):
                                 
                                 if HAS_MIPS:
                                     try:
-                                        mips_gen = MIPSGenerator()
+                                        mips_gen = MIPSGenerator(debug=True)
                                         mips_code = mips_gen.generate(quads)
                                         st.session_state.mips_code = mips_code
                                         st.session_state.console += "✅ Código MIPS generado exitosamente.\n"
@@ -1,5 +1,32 @@
+import io
+import operator
+import re
+from functools import lru_cache
 from typing import List, Dict, Optional
 
+from .register_manager import RegisterManager, _TEMP_NAME
+
+# Literales enteros con signo opcional (fullmatch en C, sin strings intermedios)
+_INT_LITERAL = re.compile(r'-?\d+').fullmatch
+
+# Registros que aparecen en los operandos de una instrucción
+_REGISTER = re.compile(r'\$\w+')
+
+# Instrucciones cuyo primer operando no es un registro destino
+_NO_DEST = frozenset({"sw", "j", "jal", "jr", "beq", "bne", "beqz", "bnez",
+                      "blt", "ble", "bgt", "bge", "div", "syscall"})
+_CONTROL = frozenset({"j", "jal", "jr", "beq", "bne", "beqz", "bnez",
+                      "blt", "ble", "bgt", "bge"})
+
+# Mnemónicos de las instrucciones de tres registros (ver _emit_rrr)
+_I_ADD, _I_SUB, _I_MUL, _I_DIV = "add", "sub", "mul", "div"
+_I_AND, _I_OR = "and", "or"
+_I_SLT, _I_SLE, _I_SGE = "slt", "sle", "sge"
+_I_SEQ, _I_SNE = "seq", "sne"
+
+# Rango del inmediato de 16 bits con signo de addi
+_IMM_MIN, _IMM_MAX = -32768, 32767
+
 class QuadOp:
     """Operaciones de cuádruplos"""
     ASSIGN = "ASSIGN"
@@ -31,8 +58,31 @@ class QuadOp:
     ARRAY_ACCESS = "ARRAY_ACCESS"
     ARRAY_ASSIGN = "ARRAY_ASSIGN"
 
+# Operaciones que leen arg1 y arg2 y escriben result
+_BINARY_OPS = frozenset({
+    QuadOp.ADD, QuadOp.SUB, QuadOp.MUL, QuadOp.DIV, QuadOp.MOD,
+    QuadOp.AND, QuadOp.OR,
+    QuadOp.LT, QuadOp.LE, QuadOp.GT, QuadOp.GE, QuadOp.EQ, QuadOp.NE,
+})
+
+class Operand:
+    """Operando de un cuádruplo ya clasificado (ver _classify)"""
+    LITERAL = "LITERAL"
+    TEMP = "TEMP"
+    VAR = "VAR"
+    REGISTER = "REGISTER"
+    
+    __slots__ = ('kind', 'value', 'int_value')
+    
+    def __init__(self, kind, value, int_value=None):
+        self.kind = kind
+        self.value = value
+        self.int_value = int_value
+
 class Quadruple:
     """Representación de un cuádruplo"""
+    __slots__ = ('op', 'arg1', 'arg2', 'result')
+    
     def __init__(self, op, arg1=None, arg2=None, result=None):
         self.op = op
         self.arg1 = arg1
@@ -53,72 +103,14 @@ class QuadrupleList:
     def add(self, op, arg1=None, arg2=None, result=None):
         self.quads.append(Quadruple(op, arg1, arg2, result))
 
-class RegisterManager:
-    """Gestor de registros MIPS"""
-    def __init__(self):
-        self.temp_regs = [f"$t{i}" for i in range(10)]  # $t0-$t9
-        self.saved_regs = [f"$s{i}" for i in range(8)]  # $s0-$s7
-        self.arg_regs = [f"$a{i}" for i in range(4)]    # $a0-$a3
-        
-        self.temp_pool = self.temp_regs.copy()
-        self.saved_pool = self.saved_regs.copy()
-        
-        self.var_to_reg = {}
-        self.temp_count = 0
-    
-    def reset(self):
-        """Reinicia el gestor"""
-        self.temp_pool = self.temp_regs.copy()
-        self.saved_pool = self.saved_regs.copy()
-        self.var_to_reg.clear()
-        self.temp_count = 0
-    
-    def allocate_temp(self, var_name=None):
-        """Asigna un registro temporal"""
-        if var_name and var_name in self.var_to_reg:
-            return self.var_to_reg[var_name]
-        
-        if not self.temp_pool:
-            # Si no hay registros disponibles, reusar
-            reg = self.temp_regs[self.temp_count % len(self.temp_regs)]
-            self.temp_count += 1
-        else:
-            reg = self.temp_pool.pop(0)
-        
-        if var_name:
-            self.var_to_reg[var_name] = reg
-        
-        return reg
-    
-    def allocate_saved(self, var_name):
-        """Asigna un registro guardado"""
-        if var_name in self.var_to_reg:
-            return self.var_to_reg[var_name]
-        
-        if not self.saved_pool:
-            # Si no hay registros disponibles, usar temporales
-            return self.allocate_temp(var_name)
-        
-        reg = self.saved_pool.pop(0)
-        self.var_to_reg[var_name] = reg
-        return reg
-    
-    def get_register(self, var_name):
-        """Obtiene el registro asignado a una variable"""
-        return self.var_to_reg.get(var_name)
-    
-    def free_temp(self, reg):
-        """Libera un registro temporal"""
-        if reg in self.temp_regs and reg not in self.temp_pool:
-            self.temp_pool.append(reg)
-    
-    def is_register(self, operand):
-        """Verifica si es un registro"""
-        return operand.startswith('$')
-    
-    def is_temp_var(self, var_name):
-        """Verifica si es una variable temporal"""
-        return var_name.startswith('t') or var_name.startswith('_t')
+def _div_trunc(a: int, b: int) -> int:
+    """División entera truncada hacia cero, como div de MIPS."""
+    quotient = abs(a) // abs(b)
+    return quotient if (a >= 0) == (b >= 0) else -quotient
+
+def _mod_trunc(a: int, b: int) -> int:
+    """Resto con el signo del dividendo, como mfhi tras div."""
+    return a - b * _div_trunc(a, b)
 
 class MIPSGenerator:
     """
@@ -132,17 +124,185 @@ class MIPSGenerator:
     - Usa $fp (frame pointer) y $sp (stack pointer) para funciones
     """
     
-    def __init__(self):
-        self.register_manager = RegisterManager()
+    # Operaciones binarias de una sola instrucción: op -> (instrucción, invertir operandos)
+    _BINOPS = {
+        QuadOp.ADD: (_I_ADD, False),
+        QuadOp.SUB: (_I_SUB, False),
+        QuadOp.MUL: (_I_MUL, False),
+        QuadOp.DIV: (_I_DIV, False),
+        QuadOp.LT: (_I_SLT, False),
+        QuadOp.GT: (_I_SLT, True),   # a > b es equivalente a b < a
+        QuadOp.LE: (_I_SLE, False),
+        QuadOp.GE: (_I_SGE, False),
+        QuadOp.EQ: (_I_SEQ, False),
+        QuadOp.NE: (_I_SNE, False),
+    }
+    
+    # Operaciones que se evalúan en compilación cuando sus operandos son literales
+    _FOLDABLE = {
+        QuadOp.ADD: operator.add,
+        QuadOp.SUB: operator.sub,
+        QuadOp.MUL: operator.mul,
+        QuadOp.DIV: _div_trunc,
+        QuadOp.MOD: _mod_trunc,
+        QuadOp.LT: lambda a, b: int(a < b),
+        QuadOp.LE: lambda a, b: int(a <= b),
+        QuadOp.GT: lambda a, b: int(a > b),
+        QuadOp.GE: lambda a, b: int(a >= b),
+        QuadOp.EQ: lambda a, b: int(a == b),
+        QuadOp.NE: lambda a, b: int(a != b),
+        QuadOp.AND: lambda a, b: int(bool(a) and bool(b)),
+        QuadOp.OR: lambda a, b: int(bool(a) or bool(b)),
+    }
+    _FOLDABLE_UNARY = {
+        QuadOp.NEG: operator.neg,
+        QuadOp.NOT: lambda a: int(not a),
+    }
+    
+    # Operaciones sin efectos secundarios: si su result no se lee se pueden eliminar
+    # (DIV y MOD quedan fuera porque la división entre cero debe seguir ocurriendo)
+    _PURE_OPS = (_BINARY_OPS - {QuadOp.DIV, QuadOp.MOD}) | {QuadOp.ASSIGN, QuadOp.NEG, QuadOp.NOT}
+    
+    # Operaciones conmutativas (la clave de CSE ordena sus operandos)
+    _COMMUTATIVE = frozenset({QuadOp.ADD, QuadOp.MUL, QuadOp.AND, QuadOp.OR, QuadOp.EQ, QuadOp.NE})
+    
+    # Operaciones que terminan un bloque básico o pueden cambiar memoria/variables
+    _BLOCK_BOUNDARIES = frozenset({
+        QuadOp.LABEL, QuadOp.GOTO, QuadOp.IF_TRUE, QuadOp.IF_FALSE,
+        QuadOp.CALL, QuadOp.BEGIN_FUNC, QuadOp.END_FUNC, QuadOp.RETURN,
+    })
+    
+    # Operaciones cuyos arg1 y arg2 son valores (y no etiquetas o nombres de función)
+    _VALUE_ARGS = _BINARY_OPS | {
+        QuadOp.ASSIGN, QuadOp.NEG, QuadOp.NOT, QuadOp.PRINT, QuadOp.PARAM,
+        QuadOp.RETURN, QuadOp.ARRAY_ASSIGN,
+    }
+    # Además, IF_* lee arg1 (la condición) y ARRAY_ACCESS lee arg2 (el índice)
+    _VALUE_ARG1 = _VALUE_ARGS | {QuadOp.IF_TRUE, QuadOp.IF_FALSE}
+    _VALUE_ARG2 = _VALUE_ARGS | {QuadOp.ARRAY_ACCESS}
+    
+    # Operaciones candidatas a CSE (calculan result solo a partir de arg1 y arg2)
+    _CSE_OPS = _BINARY_OPS | {QuadOp.NEG, QuadOp.NOT, QuadOp.ARRAY_ACCESS}
+    
+    # Puntos a los que se puede llegar por un salto o una llamada
+    _ENTRY_POINTS = frozenset({QuadOp.LABEL, QuadOp.BEGIN_FUNC, QuadOp.END_FUNC})
+    _CONDITIONAL_JUMPS = frozenset({QuadOp.IF_TRUE, QuadOp.IF_FALSE})
+    
+    # Secuencias fijas que se emiten en bloque con code.extend
+    _PROLOGUE = (
+        "addi $sp, $sp, -8",   # Espacio para $ra y $fp
+        "sw $ra, 4($sp)",      # Guardar dirección de retorno
+        "sw $fp, 0($sp)",      # Guardar frame pointer anterior
+        "move $fp, $sp",       # Nuevo frame pointer
+    )
+    _EPILOGUE = (
+        "move $sp, $fp",       # Restaurar stack pointer
+        "lw $fp, 0($sp)",      # Restaurar frame pointer
+        "lw $ra, 4($sp)",      # Restaurar dirección de retorno
+        "addi $sp, $sp, 8",    # Liberar espacio
+        "jr $ra",              # Retornar
+    )
+    # Cola de PRINT tras cargar $a0: syscall 1 = print_int + newline / 4 = print_string
+    # (los literales ya terminan en \n en .data, ver _add_string_literal)
+    _PRINT_INT_TAIL = ("li $v0, 1", "syscall", "la $a0, newline", "li $v0, 4", "syscall")
+    _PRINT_STR_TAIL = ("li $v0, 4", "syscall")
+    _EXIT = ("li $v0, 10", "syscall")
+    _TEXT_HEADER = (".text", ".globl main", "", "main:")
+    
+    # Salto equivalente a (comparación; IF_TRUE/IF_FALSE sobre su resultado)
+    _BRANCHES = {
+        (QuadOp.LT, QuadOp.IF_TRUE): "blt", (QuadOp.LT, QuadOp.IF_FALSE): "bge",
+        (QuadOp.LE, QuadOp.IF_TRUE): "ble", (QuadOp.LE, QuadOp.IF_FALSE): "bgt",
+        (QuadOp.GT, QuadOp.IF_TRUE): "bgt", (QuadOp.GT, QuadOp.IF_FALSE): "ble",
+        (QuadOp.GE, QuadOp.IF_TRUE): "bge", (QuadOp.GE, QuadOp.IF_FALSE): "blt",
+        (QuadOp.EQ, QuadOp.IF_TRUE): "beq", (QuadOp.EQ, QuadOp.IF_FALSE): "bne",
+        (QuadOp.NE, QuadOp.IF_TRUE): "bne", (QuadOp.NE, QuadOp.IF_FALSE): "beq",
+    }
+    
+    # Comparaciones con una constante C como slti:
+    # (op, posición de C) -> (sumando a C, negar el resultado)
+    _SLTI_FORMS = {
+        (QuadOp.LT, 2): (0, False),  # x < C
+        (QuadOp.GT, 1): (0, False),  # C > x   = x < C
+        (QuadOp.LE, 2): (1, False),  # x <= C  = x < C+1
+        (QuadOp.GE, 1): (1, False),  # C >= x  = x < C+1
+        (QuadOp.GE, 2): (0, True),   # x >= C  = !(x < C)
+        (QuadOp.LE, 1): (0, True),   # C <= x  = !(x < C)
+        (QuadOp.GT, 2): (1, True),   # x > C   = !(x < C+1)
+        (QuadOp.LT, 1): (1, True),   # C < x   = !(x < C+1)
+    }
+    
+    # Reglas del peephole: (patrón sobre líneas consecutivas, reemplazo,
+    # grupo con el registro que debe estar muerto después de la ventana)
+    _PEEPHOLE_RULES = [
+        # move r, r  ->  (nada)
+        (re.compile(r'move (\$\w+), \1$'), None, 0),
+        # add/sub/or dest, src, $zero y addi dest, src, 0  ->  move dest, src
+        (re.compile(r'(?:add|sub|or) (\$\w+), (\$\w+), \$zero$'), r'move \1, \2', 0),
+        (re.compile(r'addi (\$\w+), (\$\w+), 0$'), r'move \1, \2', 0),
+        # sw r, slot; lw dest, slot  ->  sw r, slot; move dest, r
+        (re.compile(r'(sw (\$\w+), (\S+))\nlw (\$\w+), \3$'), r'\1\nmove \4, \2', 0),
+        # op tmp, ...; move dest, tmp  ->  op dest, ...  (incluye li y move)
+        (re.compile(r'(add|addi|sub|mul|and|andi|or|xori|slt|slti|seq|sne|sle|sge|sll|sra|srl'
+                    r'|neg|mfhi|li|la|lw|move) (\$\w+)(, .+)\nmove (\$\w+), \2$'),
+         r'\1 \4\3', 2),
+    ]
+    
+    __slots__ = (
+        'debug', 'code', '_emit', '_emit_lines', 'register_manager',
+        'data_section', '_string_by_value', 'variables', 'string_counter',
+        'param_count', 'in_function', 'current_function', 'label_counter',
+        '_quad_index', '_quads', '_fused_branch', '_constants', '_dispatch',
+    )
+    
+    def __init__(self, debug: bool = False):
+        # En modo debug el .asm lleva comentarios (cuádruplo original, prólogo,
+        # epílogo) y una línea en blanco entre cuádruplos
+        self.debug = debug
         self.code: List[str] = []
+        # Métodos ligados a self.code; siguen siendo válidos porque la lista
+        # nunca se reemplaza (reset usa clear y el peephole asigna code[:])
+        self._emit = self.code.append
+        self._emit_lines = self.code.extend
+        self.register_manager = RegisterManager(emit=self._emit)
         self.data_section: List[str] = []
-        self.string_literals: Dict[str, str] = {}
+        self._string_by_value: Dict[str, str] = {}  # contenido -> etiqueta
         self.variables: Dict[str, int] = {}
         self.string_counter = 0
         self.param_count = 0
         self.in_function = False
         self.current_function = None
         self.label_counter = 0
+        self._quad_index = 0
+        self._quads: List[Quadruple] = []     # cuádruplos que se están traduciendo
+        self._fused_branch = -1               # índice del IF_* ya emitido junto a su comparación
+        self._constants: Dict[str, int] = {}  # temporal -> valor constante conocido
+        
+        # Tabla de despacho op -> traductor, construida una sola vez
+        self._dispatch = {
+            QuadOp.ASSIGN: self._translate_assign,
+            # MUL y DIV se sobrescriben abajo con sus versiones con corrimientos
+            **{op: self._translate_binop for op in self._BINOPS},
+            QuadOp.MUL: self._translate_mul,
+            QuadOp.DIV: self._translate_div,
+            QuadOp.MOD: self._translate_mod,
+            QuadOp.NEG: self._translate_neg,
+            QuadOp.AND: self._translate_logical,
+            QuadOp.OR: self._translate_logical,
+            QuadOp.NOT: self._translate_not,
+            QuadOp.LABEL: self._translate_label,
+            QuadOp.GOTO: self._translate_goto,
+            QuadOp.IF_TRUE: self._translate_if_true,
+            QuadOp.IF_FALSE: self._translate_if_false,
+            QuadOp.PRINT: self._translate_print,
+            QuadOp.BEGIN_FUNC: self._translate_begin_func,
+            QuadOp.END_FUNC: self._translate_end_func,
+            QuadOp.PARAM: self._translate_param,
+            QuadOp.CALL: self._translate_call,
+            QuadOp.RETURN: self._translate_return,
+            QuadOp.ARRAY_ACCESS: self._translate_array_access,
+            QuadOp.ARRAY_ASSIGN: self._translate_array_assign,
+        }
 
     def generate(self, quadruples: QuadrupleList) -> str:
         """
@@ -156,50 +316,351 @@ class MIPSGenerator:
         """
         self.reset()
         
+        # Quitar saltos a la etiqueta siguiente e invertir saltos sobre un goto
+        quadruples = self._layout_jumps(quadruples)
+        
+        # Reutilizar expresiones repetidas dentro de cada bloque básico
+        quadruples = self._eliminate_common_subexpressions(quadruples)
+        
+        # Eliminar cálculos cuyo temporal nunca se lee
+        quadruples = self._eliminate_dead_code(quadruples)
+        
+        # Acercar cada cálculo de un temporal a su primer uso (menos presión de registros)
+        quadruples = self._sink_definitions(quadruples)
+        
+        # Rangos de vida de los temporales para el linear scan
+        liveness = self._compute_liveness(quadruples)
+        
         # Generar sección de datos
         self._generate_data_section()
         
         # Generar sección de código
-        self._generate_text_section(quadruples)
+        self._generate_text_section(quadruples, liveness)
+        
+        # Los spills y recargas se decidieron en orden lineal, lo que no sirve
+        # si hay saltos de por medio: si hubo alguno, se traduce de nuevo
+        # reconciliando registros y memoria en cada frontera de bloque
+        if self.register_manager.spill_slots:
+            self._generate_text_section(quadruples, liveness, reconcile=True)
+        
+        # Optimizar el código generado
+        self._peephole_pass()
         
         # Ensamblar el programa completo
         return self._assemble_program()
     
     def reset(self):
         """Reinicia el generador."""
-        self.register_manager.reset()
-        self.code.clear()
         self.data_section.clear()
-        self.string_literals.clear()
+        self._string_by_value.clear()
         self.variables.clear()
         self.string_counter = 0
+        self.label_counter = 0
+        self._reset_text()
+    
+    def _reset_text(self):
+        """Reinicia el estado de la traducción de .text (se repite al regenerarla)."""
+        self.register_manager.reset()
+        self.code.clear()
         self.param_count = 0
         self.in_function = False
         self.current_function = None
-        self.label_counter = 0
+        self._quad_index = 0
+        self._fused_branch = -1
+        self._constants.clear()
+    
+    def _layout_jumps(self, quadruples: QuadrupleList) -> List[Quadruple]:
+        """
+        Ajusta los saltos para que el bloque siguiente se alcance por fall-through.
+        
+        - GOTO L / IF_* c, L seguidos de la etiqueta L se eliminan.
+        - IF_TRUE c, L1; GOTO L2; LABEL L1 se reescribe como IF_FALSE c, L2;
+          LABEL L1 (y viceversa), ahorrando el salto incondicional.
+        
+        Los bloques conservan su orden: el código generado desde el AST ya
+        coloca cada bloque antes de su sucesor más probable.
+        """
+        quads = list(quadruples)
+        
+        def labels_at(start):
+            names = set()
+            while start < len(quads) and quads[start].op == QuadOp.LABEL:
+                names.add(str(quads[start].arg1))
+                start += 1
+            return names
+        
+        inverted = {QuadOp.IF_TRUE: QuadOp.IF_FALSE, QuadOp.IF_FALSE: QuadOp.IF_TRUE}
+        laid_out = []
+        index = 0
+        while index < len(quads):
+            quad = quads[index]
+            if quad.op == QuadOp.GOTO and str(quad.arg1) in labels_at(index + 1):
+                index += 1
+                continue
+            if quad.op in inverted:
+                if str(quad.arg2) in labels_at(index + 1):
+                    index += 1
+                    continue
+                following = quads[index + 1] if index + 1 < len(quads) else None
+                if (following is not None and following.op == QuadOp.GOTO
+                        and str(quad.arg2) in labels_at(index + 2)):
+                    laid_out.append(Quadruple(inverted[quad.op], quad.arg1, following.arg1))
+                    index += 2
+                    continue
+            laid_out.append(quad)
+            index += 1
+        return laid_out
+    
+    def _eliminate_common_subexpressions(self, quadruples: List[Quadruple]) -> List[Quadruple]:
+        """
+        CSE local: dentro de un bloque básico, un cuádruplo que repite
+        (op, arg1, arg2) de uno anterior se reescribe como ASSIGN del resultado
+        ya calculado.
+        
+        Una expresión se olvida al redefinir cualquiera de sus operandos o el
+        nombre que guarda su valor; los accesos a arreglos se olvidan además
+        en cada ARRAY_ASSIGN.
+        """
+        available: Dict[tuple, str] = {}
+        rewritten = []
+        for quad in quadruples:
+            op = quad.op
+            if op in self._BLOCK_BOUNDARIES:
+                available.clear()
+                rewritten.append(quad)
+                continue
+            if op == QuadOp.ARRAY_ASSIGN:
+                available = {key: value for key, value in available.items()
+                             if key[0] != QuadOp.ARRAY_ACCESS}
+                rewritten.append(quad)
+                continue
+            
+            key = None
+            if op in self._CSE_OPS:
+                args = (str(quad.arg1), str(quad.arg2))
+                if op in self._COMMUTATIVE:
+                    args = tuple(sorted(args))
+                key = (op,) + args
+                if key in available:
+                    quad = Quadruple(QuadOp.ASSIGN, available[key], None, quad.result)
+            
+            # El destino cambia de valor: invalidar lo que dependía de él
+            result = str(quad.result) if quad.result is not None else None
+            if result is not None:
+                available = {k: v for k, v in available.items()
+                             if v != result and result not in k[1:]}
+                if key is not None and quad.op != QuadOp.ASSIGN and result not in key[1:]:
+                    available[key] = result
+            rewritten.append(quad)
+        return rewritten
+    
+    def _eliminate_dead_code(self, quadruples: List[Quadruple]) -> List[Quadruple]:
+        """
+        Elimina los cuádruplos puros cuyo resultado es un temporal que no se lee
+        en ningún punto del programa.
+        
+        Se cuentan los usos en todo el programa (no por orden lineal), así que
+        los valores que cruzan un salto hacia atrás nunca se consideran muertos.
+        Al eliminar un cuádruplo se descuentan los usos de sus operandos, lo
+        que puede dejar muertas a otras definiciones.
+        """
+        uses: Dict[str, int] = {}
+        definitions: Dict[str, List[int]] = {}
+        for index, quad in enumerate(quadruples):
+            read = [quad.arg1, quad.arg2]
+            if quad.op == QuadOp.ARRAY_ASSIGN:
+                read.append(quad.result)
+            elif quad.op in self._PURE_OPS and quad.result is not None:
+                definitions.setdefault(str(quad.result), []).append(index)
+            for operand in read:
+                if operand is not None:
+                    uses[str(operand)] = uses.get(str(operand), 0) + 1
+        
+        dead = set()
+        pending = [var for var in definitions
+                   if _classify(var).kind == Operand.TEMP and not uses.get(var)]
+        while pending:
+            var = pending.pop()
+            for index in definitions.pop(var, ()):
+                dead.add(index)
+                quad = quadruples[index]
+                for operand in (quad.arg1, quad.arg2):
+                    if operand is None:
+                        continue
+                    name = str(operand)
+                    uses[name] -= 1
+                    if (not uses[name] and name in definitions
+                            and _classify(name).kind == Operand.TEMP):
+                        pending.append(name)
+        
+        if not dead:
+            return quadruples
+        return [quad for index, quad in enumerate(quadruples) if index not in dead]
+    
+    def _sink_definitions(self, quadruples: List[Quadruple]) -> List[Quadruple]:
+        """
+        Dentro de cada bloque básico, retrasa los cuádruplos puros que definen
+        un temporal hasta justo antes de su primer uso, de modo que su rango de
+        vida (y el número de temporales vivos a la vez) sea el menor posible.
+        
+        Una definición pendiente se emite antes si se va a sobrescribir alguno
+        de sus operandos o el propio temporal, y al llegar al fin del bloque.
+        """
+        scheduled: List[Quadruple] = []
+        pending: Dict[str, Quadruple] = {}          # temporal -> definición sin emitir
+        readers: Dict[str, Dict[str, None]] = {}    # nombre -> temporales pendientes que lo leen
+        
+        def release(temp):
+            """Emite la definición pendiente de temp, precedida de las que ella lee."""
+            stack = [temp]
+            while stack:
+                name = stack[-1]
+                quad = pending.get(name)
+                if quad is None:
+                    stack.pop()
+                    continue
+                reads = _quad_reads(quad)
+                deps = [arg for arg in reads if arg in pending and arg != name]
+                if deps:
+                    stack.extend(deps)
+                    continue
+                stack.pop()
+                del pending[name]
+                for arg in reads:
+                    readers[arg].pop(name, None)
+                scheduled.append(quad)
+        
+        for quad in quadruples:
+            reads = _quad_reads(quad)
+            for name in reads:
+                release(name)
+            if quad.op in self._BLOCK_BOUNDARIES:
+                for temp in list(pending):
+                    release(temp)
+            
+            written = None if quad.op == QuadOp.ARRAY_ASSIGN or quad.result is None else str(quad.result)
+            if written is not None:
+                release(written)
+                for temp in list(readers.get(written, ())):
+                    release(temp)
+            
+            if quad.op in self._PURE_OPS and written is not None and _TEMP_NAME.match(written):
+                pending[written] = quad
+                for name in reads:
+                    readers.setdefault(name, {})[written] = None
+            else:
+                scheduled.append(quad)
+        
+        for temp in list(pending):
+            release(temp)
+        return scheduled
+    
+    def _compute_liveness(self, quadruples: QuadrupleList) -> tuple:
+        """
+        Calcula el índice del último uso de cada temporal en la lista de cuádruplos.
+        
+        Los rangos que están vivos al entrar a un ciclo (definidos antes de la
+        etiqueta, o leídos dentro del ciclo antes de escribirse) se extienden
+        hasta el salto hacia atrás, porque la siguiente iteración los vuelve a leer.
+        
+        Returns:
+            Tupla (temporal -> índice del cuádruplo donde termina su rango,
+                   temporal -> índices de los cuádruplos que lo leen,
+                   temporal -> etiqueta del ciclo al que se extendió su rango)
+        """
+        labels: Dict[str, int] = {}
+        jumps = []
+        occurrences: Dict[str, List[tuple]] = {}  # temporal -> [(índice, es_definición)]
+        
+        for index, quad in enumerate(quadruples):
+            op = quad.op
+            if op == QuadOp.LABEL:
+                labels[str(quad.arg1)] = index
+                continue
+            if op == QuadOp.GOTO:
+                jumps.append((index, str(quad.arg1)))
+                continue
+            if op in self._CONDITIONAL_JUMPS:
+                jumps.append((index, str(quad.arg2)))
+            
+            operands = [(quad.arg1, False), (quad.arg2, False)]
+            # En ARRAY_ASSIGN el result es la base del arreglo (se lee)
+            operands.append((quad.result, op != QuadOp.ARRAY_ASSIGN))
+            for operand, is_def in operands:
+                if operand is not None and _TEMP_NAME.match(str(operand)):
+                    occurrences.setdefault(str(operand), []).append((index, is_def))
+        
+        ranges = {var: [occ[0][0], occ[-1][0]] for var, occ in occurrences.items()}
+        back_edges = [(labels[label], index) for index, label in jumps
+                      if label in labels and labels[label] <= index]
+        loop_heads: Dict[str, int] = {}
+        
+        changed = True
+        while changed:
+            changed = False
+            for head, tail in back_edges:
+                for var, live in ranges.items():
+                    if live[1] >= tail:
+                        continue
+                    if live[0] < head <= live[1]:
+                        live_in = True
+                    else:
+                        inside = [is_def for i, is_def in occurrences[var] if head <= i <= tail]
+                        live_in = bool(inside) and not inside[0]
+                    if live_in:
+                        live[1] = tail
+                        loop_heads[var] = head
+                        changed = True
+        
+        uses = {var: [i for i, is_def in occ if not is_def] for var, occ in occurrences.items()}
+        return {var: live[1] for var, live in ranges.items()}, uses, loop_heads
     
     def _generate_data_section(self):
         """Genera la sección .data con variables globales y strings."""
         self.data_section.append(".data")
         self.data_section.append("newline: .asciiz \"\\n\"")
+        # Un literal "\n" del programa reutiliza esta etiqueta
+        self._string_by_value["\\n"] = "newline"
 
-    def _generate_text_section(self, quadruples: QuadrupleList):
-        """Genera la sección .text con el código principal."""
-        self.code.append(".text")
-        self.code.append(".globl main")
-        self.code.append("")
-        self.code.append("main:")
+    def _generate_text_section(self, quadruples: QuadrupleList, liveness: tuple,
+                               reconcile: bool = False):
+        """
+        Genera la sección .text con el código principal.
         
-        # Traducir cada cuádruplo
-        for quad in quadruples:
-            self._translate_quadruple(quad)
+        Args:
+            quadruples: Cuádruplos a traducir
+            liveness: Resultado de _compute_liveness
+            reconcile: Guardar los registros temporales en cada frontera de bloque
+        """
+        self._reset_text()
+        register_manager = self.register_manager
+        live_end, uses, loop_heads = liveness
+        register_manager.live_end.update(live_end)
+        register_manager.uses.update(uses)
+        register_manager.loop_heads.update(loop_heads)
+        register_manager.reconcile = reconcile
+        
+        self._emit_lines(self._TEXT_HEADER)
+        
+        # Traducir cada cuádruplo (métodos resueltos una sola vez fuera del ciclo)
+        expire = register_manager.expire
+        translate = self._translate_quadruple
+        self._quads = quadruples
+        for index, quad in enumerate(quadruples):
+            if index == self._fused_branch:
+                continue
+            self._quad_index = index
+            expire(index)
+            register_manager.pinned = {
+                str(arg) for arg in (quad.arg1, quad.arg2, quad.result) if arg is not None
+            }
+            translate(quad)
         
         # Agregar código de salida si no estamos en una función
         if not self.in_function:
-            self.code.append("")
-            self.code.append("# Exit program")
-            self.code.append("li $v0, 10")
-            self.code.append("syscall")
+            if self.debug:
+                self._emit_lines(("", "# Exit program"))
+            self._emit_lines(self._EXIT)
     
     def _translate_quadruple(self, quad: Quadruple):
         """
@@ -209,259 +670,370 @@ class MIPSGenerator:
             quad: Cuádruplo a traducir
         """
         # Agregar comentario con el cuádruplo original
-        self.code.append(f"# {quad}")
+        if self.debug:
+            self._emit(f"# {quad}")
+        
+        # Un operando faltante se cargaría como $zero sin avisar
+        if quad.op in _BINARY_OPS and (quad.arg1 is None or quad.arg2 is None):
+            self._emit(f"# ERROR: operación binaria incompleta {quad.op}")
+            if self.debug:
+                self._emit("")
+            return
+        
+        quad = self._try_fold(quad)
         
         # Despachar según el operador
-        if quad.op == QuadOp.ASSIGN:
-            self._translate_assign(quad)
-        elif quad.op == QuadOp.ADD:
-            self._translate_add(quad)
-        elif quad.op == QuadOp.SUB:
-            self._translate_sub(quad)
-        elif quad.op == QuadOp.MUL:
-            self._translate_mul(quad)
-        elif quad.op == QuadOp.DIV:
-            self._translate_div(quad)
-        elif quad.op == QuadOp.MOD:
-            self._translate_mod(quad)
-        elif quad.op == QuadOp.NEG:
-            self._translate_neg(quad)
-        elif quad.op == QuadOp.AND:
-            self._translate_and(quad)
-        elif quad.op == QuadOp.OR:
-            self._translate_or(quad)
-        elif quad.op == QuadOp.NOT:
-            self._translate_not(quad)
-        elif quad.op == QuadOp.LABEL:
-            self._translate_label(quad)
-        elif quad.op == QuadOp.GOTO:
-            self._translate_goto(quad)
-        elif quad.op == QuadOp.IF_TRUE:
-            self._translate_if_true(quad)
-        elif quad.op == QuadOp.IF_FALSE:
-            self._translate_if_false(quad)
-        elif quad.op == QuadOp.LT:
-            self._translate_lt(quad)
-        elif quad.op == QuadOp.LE:
-            self._translate_le(quad)
-        elif quad.op == QuadOp.GT:
-            self._translate_gt(quad)
-        elif quad.op == QuadOp.GE:
-            self._translate_ge(quad)
-        elif quad.op == QuadOp.EQ:
-            self._translate_eq(quad)
-        elif quad.op == QuadOp.NE:
-            self._translate_ne(quad)
-        elif quad.op == QuadOp.PRINT:
-            self._translate_print(quad)
-        elif quad.op == QuadOp.BEGIN_FUNC:
-            self._translate_begin_func(quad)
-        elif quad.op == QuadOp.END_FUNC:
-            self._translate_end_func(quad)
-        elif quad.op == QuadOp.PARAM:
-            self._translate_param(quad)
-        elif quad.op == QuadOp.CALL:
-            self._translate_call(quad)
-        elif quad.op == QuadOp.RETURN:
-            self._translate_return(quad)
-        elif quad.op == QuadOp.ARRAY_ACCESS:
-            self._translate_array_access(quad)
-        elif quad.op == QuadOp.ARRAY_ASSIGN:
-            self._translate_array_assign(quad)
-        else:
-            self.code.append(f"# TODO: Implementar {quad.op}")
+        self._dispatch.get(quad.op, self._translate_unsupported)(quad)
         
-        self.code.append("")
+        if self.debug:
+            self._emit("")
+    
+    def _translate_unsupported(self, quad: Quadruple):
+        """Deja constancia de un operador que el generador aún no traduce."""
+        self._emit(f"# TODO: Implementar {quad.op}")
     
     def _translate_assign(self, quad: Quadruple):
         """Traduce ASSIGN: result = arg1"""
-        if quad.arg1 and str(quad.arg1).lstrip('-').isdigit():
+        if _is_int_literal(quad.arg1):
             # Es una constante numérica
             dest = self._get_or_allocate_register(quad.result)
-            self.code.append(f"li {dest}, {quad.arg1}")
-        else:
+            self._emit(f"li {dest}, {quad.arg1}")
+        elif not self._coalesce(quad.arg1, quad.result):
             # Es una variable o temporal
             src = self._load_operand(quad.arg1)
             dest = self._get_or_allocate_register(quad.result)
             
             if src != dest:
-                self.code.append(f"move {dest}, {src}")
+                self._emit(f"move {dest}, {src}")
+    
+    def _coalesce(self, src_name, dest_name) -> bool:
+        """
+        Reutiliza para el destino el registro de un temporal que muere en este
+        cuádruplo (t = expr; x = t), evitando emitir el move.
+        
+        Returns:
+            True si se renombró el registro y no hay que emitir nada
+        """
+        if not src_name or not dest_name:
+            return False
+        
+        src_name, dest_name = str(src_name), str(dest_name)
+        rm = self.register_manager
+        if (not _TEMP_NAME.match(src_name)
+                or rm.get_register(src_name) is None
+                or rm.get_register(dest_name) is not None
+                or rm.live_end.get(src_name, -1) > self._quad_index):
+            return False
+        
+        rm.rename(src_name, dest_name)
+        return True
 
-    def _translate_add(self, quad: Quadruple):
-        """Traduce ADD: result = arg1 + arg2"""
+    def _allocate_result(self, result, *sources) -> str:
+        """
+        Registro destino de una operación: si uno de los temporales fuente muere
+        en este cuádruplo se reutiliza su registro (la instrucción lee las
+        fuentes antes de escribir el destino).
+        """
+        for source in sources:
+            if self._coalesce(source, result):
+                return self.register_manager.get_register(str(result))
+        return self._get_or_allocate_register(result)
+    
+    def _translate_binop(self, quad: Quadruple):
+        """Traduce ADD, SUB, MUL, DIV, LT, GT, LE, GE, EQ y NE: result = arg1 op arg2"""
+        if self._translate_branch(quad) or self._translate_immediate(quad):
+            return
+        
+        instr, swap = self._BINOPS[quad.op]
         src1 = self._load_operand(quad.arg1)
         src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
+        dest = self._allocate_result(quad.result, quad.arg1, quad.arg2)
         
-        self.code.append(f"add {dest}, {src1}, {src2}")
+        if swap:
+            src1, src2 = src2, src1
+        self._emit_rrr(instr, dest, src1, src2)
     
-    def _translate_sub(self, quad: Quadruple):
-        """Traduce SUB: result = arg1 - arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
+    def _try_fold(self, quad: Quadruple) -> Quadruple:
+        """
+        Sustituye los temporales de valor conocido por su literal y, si todos
+        los operandos resultan literales, reescribe el cuádruplo como ASSIGN
+        del valor calculado.
         
-        self.code.append(f"sub {dest}, {src1}, {src2}")
+        Los valores conocidos se olvidan en cada etiqueta (por un salto pueden
+        llegar otros valores) y al redefinir el temporal.
+        """
+        op = quad.op
+        constants = self._constants
+        if op in self._ENTRY_POINTS:
+            constants.clear()
+            return quad
+        
+        # Sustituir operandos (en IF_* arg2 es la etiqueta; en ARRAY_ACCESS arg1 es la base)
+        arg1, arg2 = quad.arg1, quad.arg2
+        if constants:
+            if op in self._VALUE_ARG1:
+                if str(arg1) in constants:
+                    arg1 = str(constants[str(arg1)])
+            if op in self._VALUE_ARG2:
+                if str(arg2) in constants:
+                    arg2 = str(constants[str(arg2)])
+        
+        value = None
+        if op in self._FOLDABLE and _is_int_literal(arg1) and _is_int_literal(arg2):
+            a, b = _classify(arg1).int_value, _classify(arg2).int_value
+            if not (b == 0 and op in (QuadOp.DIV, QuadOp.MOD)):
+                value = _wrap32(self._FOLDABLE[op](a, b))
+        elif op in self._FOLDABLE_UNARY and _is_int_literal(arg1):
+            value = _wrap32(self._FOLDABLE_UNARY[op](_classify(arg1).int_value))
+        elif op == QuadOp.ASSIGN and _is_int_literal(arg1):
+            value = _classify(arg1).int_value
+        
+        # Registrar o invalidar el valor conocido del destino
+        result = quad.result
+        if result is not None and op != QuadOp.ARRAY_ASSIGN:
+            if value is not None and _classify(result).kind == Operand.TEMP:
+                constants[str(result)] = value
+            else:
+                constants.pop(str(result), None)
+        
+        if value is not None and op != QuadOp.ASSIGN:
+            return Quadruple(QuadOp.ASSIGN, str(value), None, result)
+        if arg1 is not quad.arg1 or arg2 is not quad.arg2:
+            return Quadruple(op, arg1, arg2, result)
+        return quad
     
-    def _translate_mul(self, quad: Quadruple):
-        """Traduce MUL: result = arg1 * arg2"""
+    def _translate_branch(self, quad: Quadruple) -> bool:
+        """
+        Fusiona una comparación con el IF_TRUE/IF_FALSE siguiente que la
+        consume (t = a < b; if_false t goto L  ->  bge a, b, L). Solo se hace
+        si el temporal muere en ese salto, así que nunca ocupa un registro.
+        
+        Returns:
+            True si se emitió el salto (el IF_* siguiente se omite)
+        """
+        index = self._quad_index + 1
+        if index >= len(self._quads):
+            return False
+        jump = self._quads[index]
+        branch = self._BRANCHES.get((quad.op, jump.op))
+        result = str(quad.result)
+        if (branch is None or str(jump.arg1) != result
+                or self.register_manager.live_end.get(result) != index):
+            return False
+        
         src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
+        if _is_int_literal(quad.arg2) and _classify(quad.arg2).int_value != 0:
+            src2 = str(_classify(quad.arg2).int_value)  # las pseudoinstrucciones aceptan inmediato
+        else:
+            src2 = self._load_operand(quad.arg2)
+        self.register_manager.end_block()
+        self._emit(f"{branch} {src1}, {src2}, {jump.arg2}")
+        self._fused_branch = index
+        return True
+    
+    def _translate_immediate(self, quad: Quadruple) -> bool:
+        """
+        Traduce ADD, SUB y las comparaciones de orden con una constante de 16
+        bits en su forma con inmediato: addi (sub x, C = addi x, -C) y slti,
+        seguido de xori cuando la comparación es la negación de x < C.
         
-        self.code.append(f"mul {dest}, {src1}, {src2}")
+        Returns:
+            True si se emitió la instrucción con inmediato
+        """
+        op, negate = quad.op, False
+        if op == QuadOp.ADD and _is_int_literal(quad.arg2):
+            instr, operand, imm = "addi", quad.arg1, _classify(quad.arg2).int_value
+        elif op == QuadOp.ADD and _is_int_literal(quad.arg1):
+            instr, operand, imm = "addi", quad.arg2, _classify(quad.arg1).int_value
+        elif op == QuadOp.SUB and _is_int_literal(quad.arg2):
+            instr, operand, imm = "addi", quad.arg1, -_classify(quad.arg2).int_value
+        elif (op, 2) in self._SLTI_FORMS and _is_int_literal(quad.arg2):
+            bump, negate = self._SLTI_FORMS[op, 2]
+            instr, operand, imm = "slti", quad.arg1, _classify(quad.arg2).int_value + bump
+        elif (op, 1) in self._SLTI_FORMS and _is_int_literal(quad.arg1):
+            bump, negate = self._SLTI_FORMS[op, 1]
+            instr, operand, imm = "slti", quad.arg2, _classify(quad.arg1).int_value + bump
+        else:
+            return False
+        
+        if not _IMM_MIN <= imm <= _IMM_MAX:
+            return False
+        
+        src = self._load_operand(operand)
+        dest = self._allocate_result(quad.result, operand)
+        self._emit(f"{instr} {dest}, {src}, {imm}")
+        if negate:
+            self._emit(f"xori {dest}, {dest}, 1")
+        return True
+    
+    def _translate_logical_constant(self, quad: Quadruple) -> bool:
+        """
+        Traduce AND/OR con un operando literal: según la constante el resultado
+        es fijo (li) o solo depende del otro operando (sne contra $zero).
+        
+        Returns:
+            True si uno de los operandos era literal
+        """
+        if _is_int_literal(quad.arg2):
+            operand, constant = quad.arg1, _classify(quad.arg2).int_value
+        elif _is_int_literal(quad.arg1):
+            operand, constant = quad.arg2, _classify(quad.arg1).int_value
+        else:
+            return False
+        
+        # x && 0 = 0, x || C = 1 (C != 0); en los demás casos el resultado es x != 0
+        if quad.op == QuadOp.AND and constant == 0:
+            self._emit(f"li {self._get_or_allocate_register(quad.result)}, 0")
+        elif quad.op == QuadOp.OR and constant != 0:
+            self._emit(f"li {self._get_or_allocate_register(quad.result)}, 1")
+        else:
+            src = self._load_operand(operand)
+            dest = self._allocate_result(quad.result, operand)
+            self._emit_rrr(_I_SNE, dest, src, "$zero")
+        return True
+    
+    def _translate_mul(self, quad: Quadruple):
+        """Traduce MUL: result = arg1 * arg2 (con sll si un factor es potencia de 2)"""
+        for value, factor in ((quad.arg1, quad.arg2), (quad.arg2, quad.arg1)):
+            shift = _log2_literal(factor)
+            if shift is not None:
+                src = self._load_operand(value)
+                dest = self._allocate_result(quad.result, value)
+                self._emit(f"sll {dest}, {src}, {shift}")
+                return
+        
+        self._translate_binop(quad)
     
     def _translate_div(self, quad: Quadruple):
-        """Traduce DIV: result = arg1 / arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
+        """Traduce DIV: result = arg1 / arg2 (con sra si el divisor es potencia de 2)"""
+        shift = _log2_literal(quad.arg2)
+        if shift is None:
+            self._translate_binop(quad)
+            return
         
-        self.code.append(f"div {dest}, {src1}, {src2}")
+        src = self._load_operand(quad.arg1)
+        dest = self._allocate_result(quad.result, quad.arg1)
+        if shift == 0:
+            if src != dest:
+                self._emit(f"move {dest}, {src}")
+            return
+        
+        # sra redondea hacia -infinito y div trunca hacia cero: a los negativos
+        # se les suma (2^k - 1) antes del corrimiento
+        temp = self.register_manager.allocate_temp()
+        if shift == 1:
+            bias = (f"srl {temp}, {src}, 31",)
+        else:
+            bias = (f"sra {temp}, {src}, 31", f"srl {temp}, {temp}, {32 - shift}")
+        self._emit_lines(bias + (f"{_I_ADD} {temp}, {src}, {temp}", f"sra {dest}, {temp}, {shift}"))
+        self.register_manager.free_temp(temp)
     
     def _translate_mod(self, quad: Quadruple):
-        """Traduce MOD: result = arg1 % arg2"""
+        """Traduce MOD: result = arg1 % arg2 (con andi si el divisor es potencia de 2)"""
+        shift = _log2_literal(quad.arg2)
+        if shift is not None and shift <= 16:
+            self._translate_mod_pow2(quad, shift)
+            return
+        
         src1 = self._load_operand(quad.arg1)
         src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
+        dest = self._allocate_result(quad.result, quad.arg1, quad.arg2)
         
         # MIPS usa div y luego mfhi para obtener el resto
-        self.code.append(f"div {src1}, {src2}")
-        self.code.append(f"mfhi {dest}")
+        self._emit_lines((f"div {src1}, {src2}", f"mfhi {dest}"))
+    
+    def _translate_mod_pow2(self, quad: Quadruple, shift: int):
+        """
+        Resto entre 2^shift sin div. El resto de MIPS lleva el signo del
+        dividendo, así que no basta con andi: se calcula
+        ((x + sesgo) & (2^k - 1)) - sesgo, con sesgo = 2^k - 1 si x < 0 y 0 si no.
+        """
+        src = self._load_operand(quad.arg1)
+        dest = self._allocate_result(quad.result, quad.arg1)
+        if shift == 0:
+            self._emit(f"li {dest}, 0")
+            return
+        
+        bias = self.register_manager.allocate_temp()
+        temp = self.register_manager.allocate_temp()
+        if shift == 1:
+            lines = (f"srl {bias}, {src}, 31",)
+        else:
+            lines = (f"sra {bias}, {src}, 31", f"srl {bias}, {bias}, {32 - shift}")
+        self._emit_lines(lines + (
+            f"{_I_ADD} {temp}, {src}, {bias}",
+            f"andi {temp}, {temp}, {(1 << shift) - 1}",
+            f"{_I_SUB} {dest}, {temp}, {bias}",
+        ))
+        self.register_manager.free_temp(temp)
+        self.register_manager.free_temp(bias)
     
     def _translate_neg(self, quad: Quadruple):
         """Traduce NEG: result = -arg1"""
         src = self._load_operand(quad.arg1)
-        dest = self._get_or_allocate_register(quad.result)
+        dest = self._allocate_result(quad.result, quad.arg1)
         
-        self.code.append(f"neg {dest}, {src}")
+        self._emit(f"neg {dest}, {src}")
     
-    def _translate_and(self, quad: Quadruple):
-        """Traduce AND: result = arg1 && arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        # AND lógico: ambos deben ser != 0
-        temp1 = self.register_manager.allocate_temp()
-        temp2 = self.register_manager.allocate_temp()
-        
-        self.code.append(f"sne {temp1}, {src1}, $zero")
-        self.code.append(f"sne {temp2}, {src2}, $zero")
-        self.code.append(f"and {dest}, {temp1}, {temp2}")
+    def _translate_logical(self, quad: Quadruple):
+        """Traduce AND y OR lógicos: result = arg1 && arg2 / arg1 || arg2"""
+        if self._translate_logical_constant(quad):
+            return
         
-        self.register_manager.free_temp(temp1)
-        self.register_manager.free_temp(temp2)
-    
-    def _translate_or(self, quad: Quadruple):
-        """Traduce OR: result = arg1 || arg2"""
         src1 = self._load_operand(quad.arg1)
         src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        # OR lógico: al menos uno debe ser != 0
-        temp1 = self.register_manager.allocate_temp()
-        temp2 = self.register_manager.allocate_temp()
+        dest = self._allocate_result(quad.result, quad.arg1, quad.arg2)
         
-        self.code.append(f"sne {temp1}, {src1}, $zero")
-        self.code.append(f"sne {temp2}, {src2}, $zero")
-        self.code.append(f"or {dest}, {temp1}, {temp2}")
+        if quad.op == QuadOp.OR:
+            # OR lógico: (a | b) != 0
+            self._emit_lines((
+                f"{_I_OR} {dest}, {src1}, {src2}",
+                f"{_I_SNE} {dest}, {dest}, $zero",
+            ))
+            return
         
-        self.register_manager.free_temp(temp1)
-        self.register_manager.free_temp(temp2)
+        # AND lógico: ambos deben ser != 0 (src1 se normaliza antes de escribir dest)
+        temp = self.register_manager.allocate_temp()
+        self._emit_lines((
+            f"{_I_SNE} {temp}, {src1}, $zero",
+            f"{_I_SNE} {dest}, {src2}, $zero",
+            f"{_I_AND} {dest}, {dest}, {temp}",
+        ))
+        self.register_manager.free_temp(temp)
     
     def _translate_not(self, quad: Quadruple):
         """Traduce NOT: result = !arg1"""
         src = self._load_operand(quad.arg1)
-        dest = self._get_or_allocate_register(quad.result)
+        dest = self._allocate_result(quad.result, quad.arg1)
         
         # NOT lógico: 0 -> 1, cualquier otro -> 0
-        self.code.append(f"seq {dest}, {src}, $zero")
+        self._emit(f"seq {dest}, {src}, $zero")
     
     def _translate_label(self, quad: Quadruple):
         """Traduce LABEL: etiqueta"""
-        self.code.append(f"{quad.arg1}:")
+        self.register_manager.end_block()
+        self._emit(f"{quad.arg1}:")
     
     def _translate_goto(self, quad: Quadruple):
         """Traduce GOTO: salto incondicional"""
-        self.code.append(f"j {quad.arg1}")
+        self.register_manager.end_block()
+        self._emit(f"j {quad.arg1}")
     
     def _translate_if_true(self, quad: Quadruple):
         """Traduce IF_TRUE: if arg1 goto arg2"""
         cond = self._load_operand(quad.arg1)
         label = quad.arg2
         
-        self.code.append(f"bnez {cond}, {label}")
+        self.register_manager.end_block()
+        self._emit(f"bnez {cond}, {label}")
     
     def _translate_if_false(self, quad: Quadruple):
         """Traduce IF_FALSE: if not arg1 goto arg2"""
         cond = self._load_operand(quad.arg1)
         label = quad.arg2
         
-        self.code.append(f"beqz {cond}, {label}")
-    
-    def _translate_lt(self, quad: Quadruple):
-        """Traduce LT: result = arg1 < arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        self.code.append(f"slt {dest}, {src1}, {src2}")
-    
-    def _translate_le(self, quad: Quadruple):
-        """Traduce LE: result = arg1 <= arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        # a <= b es equivalente a !(a > b)
-        temp = self.register_manager.allocate_temp()
-        self.code.append(f"slt {temp}, {src2}, {src1}")  # temp = (b < a) = (a > b)
-        self.code.append(f"xori {dest}, {temp}, 1")       # dest = !(a > b)
-        self.register_manager.free_temp(temp)
-    
-    def _translate_gt(self, quad: Quadruple):
-        """Traduce GT: result = arg1 > arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        # a > b es equivalente a b < a
-        self.code.append(f"slt {dest}, {src2}, {src1}")
-    
-    def _translate_ge(self, quad: Quadruple):
-        """Traduce GE: result = arg1 >= arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        # a >= b es equivalente a !(a < b)
-        self.code.append(f"slt {dest}, {src1}, {src2}")
-        self.code.append(f"xori {dest}, {dest}, 1")
-    
-    def _translate_eq(self, quad: Quadruple):
-        """Traduce EQ: result = arg1 == arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        # a == b
-        temp = self.register_manager.allocate_temp()
-        self.code.append(f"sub {temp}, {src1}, {src2}")
-        self.code.append(f"seq {dest}, {temp}, $zero")
-        self.register_manager.free_temp(temp)
-    
-    def _translate_ne(self, quad: Quadruple):
-        """Traduce NE: result = arg1 != arg2"""
-        src1 = self._load_operand(quad.arg1)
-        src2 = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
-        
-        # a != b
-        temp = self.register_manager.allocate_temp()
-        self.code.append(f"sub {temp}, {src1}, {src2}")
-        self.code.append(f"sne {dest}, {temp}, $zero")
-        self.register_manager.free_temp(temp)
+        self.register_manager.end_block()
+        self._emit(f"beqz {cond}, {label}")
     
     def _translate_print(self, quad: Quadruple):
         """Traduce PRINT: imprime un valor o una cadena."""
@@ -470,20 +1042,13 @@ class MIPSGenerator:
         if arg.startswith('"') and arg.endswith('"'):
             # Es un string literal
             label = self._add_string_literal(arg)
-            self.code.append(f"la $a0, {label}")
-            self.code.append("li $v0, 4")  # syscall 4 = print_string
-            self.code.append("syscall")
+            self._emit(f"la $a0, {label}")
+            self._emit_lines(self._PRINT_STR_TAIL)
         else:
             # Es un número o variable
             value = self._load_operand(quad.arg1)
-            self.code.append(f"move $a0, {value}")
-            self.code.append("li $v0, 1")  # syscall 1 = print_int
-            self.code.append("syscall")
-        
-        # Imprimir newline
-        self.code.append("la $a0, newline")
-        self.code.append("li $v0, 4")
-        self.code.append("syscall")
+            self._emit(f"move $a0, {value}")
+            self._emit_lines(self._PRINT_INT_TAIL)
     
     def _translate_begin_func(self, quad: Quadruple):
         """Traduce BEGIN_FUNC: inicio de una función"""
@@ -491,21 +1056,21 @@ class MIPSGenerator:
         self.in_function = True
         self.current_function = func_name
         
-        self.code.append(f"{func_name}:")
-        self.code.append("# Prólogo de función")
-        self.code.append("addi $sp, $sp, -8")  # Espacio para $ra y $fp
-        self.code.append("sw $ra, 4($sp)")     # Guardar dirección de retorno
-        self.code.append("sw $fp, 0($sp)")     # Guardar frame pointer anterior
-        self.code.append("move $fp, $sp")      # Nuevo frame pointer
+        self.register_manager.end_block()
+        self._emit(f"{func_name}:")
+        if self.debug:
+            self._emit("# Prólogo de función")
+        self._emit_lines(self._PROLOGUE)
     
     def _translate_end_func(self, quad: Quadruple):
         """Traduce END_FUNC: fin de una función"""
-        self.code.append("# Epílogo de función")
-        self.code.append("move $sp, $fp")      # Restaurar stack pointer
-        self.code.append("lw $fp, 0($sp)")     # Restaurar frame pointer
-        self.code.append("lw $ra, 4($sp)")     # Restaurar dirección de retorno
-        self.code.append("addi $sp, $sp, 8")   # Liberar espacio
-        self.code.append("jr $ra")             # Retornar
+        # Destino de los saltos que emite _translate_return
+        self.register_manager.end_block()
+        if self.current_function:
+            self._emit(f"{self.current_function}_end:")
+        if self.debug:
+            self._emit("# Epílogo de función")
+        self._emit_lines(self._EPILOGUE)
         
         self.in_function = False
         self.current_function = None
@@ -518,11 +1083,11 @@ class MIPSGenerator:
         if self.param_count < 4:
             # Primeros 4 parámetros en $a0-$a3
             arg_reg = f"$a{self.param_count}"
-            self.code.append(f"move {arg_reg}, {param_value}")
+            self._emit(f"move {arg_reg}, {param_value}")
         else:
             # Parámetros adicionales en el stack
-            self.code.append(f"addi $sp, $sp, -4")
-            self.code.append(f"sw {param_value}, 0($sp)")
+            self._emit("addi $sp, $sp, -4")
+            self._emit(f"sw {param_value}, 0($sp)")
         
         self.param_count += 1
     
@@ -531,17 +1096,17 @@ class MIPSGenerator:
         func_name = quad.arg1
         result = quad.result
         
-        self.code.append(f"jal {func_name}")
+        self._emit(f"jal {func_name}")
         
         # Si hay un resultado, guardarlo desde $v0
         if result:
             dest = self._get_or_allocate_register(result)
-            self.code.append(f"move {dest}, $v0")
+            self._emit(f"move {dest}, $v0")
         
         # Limpiar parámetros del stack si hay más de 4
         if self.param_count > 4:
             extra_params = self.param_count - 4
-            self.code.append(f"addi $sp, $sp, {extra_params * 4}")
+            self._emit(f"addi $sp, $sp, {extra_params * 4}")
         
         self.param_count = 0
     
@@ -550,26 +1115,29 @@ class MIPSGenerator:
         if quad.arg1:
             # Hay un valor de retorno
             ret_value = self._load_operand(quad.arg1)
-            self.code.append(f"move $v0, {ret_value}")
+            self._emit(f"move $v0, {ret_value}")
         
         # Saltar al epílogo (END_FUNC se encargará del resto)
         if self.current_function:
-            self.code.append(f"j {self.current_function}_end")
+            self.register_manager.end_block()
+            self._emit(f"j {self.current_function}_end")
     
     def _translate_array_access(self, quad: Quadruple):
         """Traduce ARRAY_ACCESS: result = array[index]"""
         array_base = quad.arg1  # Dirección base del arreglo
         index = self._load_operand(quad.arg2)
-        dest = self._get_or_allocate_register(quad.result)
+        dest = self._allocate_result(quad.result, quad.arg2)
         
         # Calcular dirección: base + index * 4
         temp = self.register_manager.allocate_temp()
-        self.code.append(f"sll {temp}, {index}, 2")  # temp = index * 4
+        self._emit(f"sll {temp}, {index}, 2")  # temp = index * 4
         
         # Cargar la dirección base del arreglo
-        base_reg = self._get_or_allocate_register(array_base)
-        self.code.append(f"add {temp}, {base_reg}, {temp}")  # temp = base + offset
-        self.code.append(f"lw {dest}, 0({temp})")  # dest = memory[temp]
+        base_reg = self._load_operand(array_base)
+        self._emit_lines((
+            f"{_I_ADD} {temp}, {base_reg}, {temp}",  # temp = base + offset
+            f"lw {dest}, 0({temp})",                 # dest = memory[temp]
+        ))
         
         self.register_manager.free_temp(temp)
     
@@ -581,15 +1149,21 @@ class MIPSGenerator:
         
         # Calcular dirección: base + index * 4
         temp = self.register_manager.allocate_temp()
-        self.code.append(f"sll {temp}, {index}, 2")  # temp = index * 4
+        self._emit(f"sll {temp}, {index}, 2")  # temp = index * 4
         
         # Cargar la dirección base del arreglo
-        base_reg = self._get_or_allocate_register(array_base)
-        self.code.append(f"add {temp}, {base_reg}, {temp}")  # temp = base + offset
-        self.code.append(f"sw {value}, 0({temp})")  # memory[temp] = value
+        base_reg = self._load_operand(array_base)
+        self._emit_lines((
+            f"{_I_ADD} {temp}, {base_reg}, {temp}",  # temp = base + offset
+            f"sw {value}, 0({temp})",                # memory[temp] = value
+        ))
         
         self.register_manager.free_temp(temp)
     
+    def _emit_rrr(self, instr: str, dest: str, src1: str, src2: str):
+        """Emite una instrucción de tres registros: instr dest, src1, src2"""
+        self._emit(f"{instr} {dest}, {src1}, {src2}")
+    
     def _load_operand(self, operand: str) -> str:
         """
         Carga un operando en un registro.
@@ -603,16 +1177,19 @@ class MIPSGenerator:
         if not operand:
             return "$zero"
         
-        operand = str(operand)
+        op = _classify(operand)
+        operand = op.value
         
         # Si es un registro, retornarlo directamente
-        if self.register_manager.is_register(operand):
+        if op.kind == Operand.REGISTER:
             return operand
         
-        # Si es un número literal
-        if operand.lstrip('-').isdigit():
+        # Si es un número literal (el 0 ya está en $zero)
+        if op.kind == Operand.LITERAL:
+            if op.int_value == 0:
+                return "$zero"
             reg = self.register_manager.allocate_temp()
-            self.code.append(f"li {reg}, {operand}")
+            self._emit(f"li {reg}, {operand}")
             return reg
         
         # Si es una variable o temporal
@@ -621,10 +1198,16 @@ class MIPSGenerator:
             return reg
         
         # Asignar un nuevo registro
-        if self.register_manager.is_temp_var(operand):
-            return self.register_manager.allocate_temp(operand)
+        if op.kind == Operand.TEMP:
+            reg = self.register_manager.allocate_temp(operand)
         else:
-            return self.register_manager.allocate_saved(operand)
+            reg = self.register_manager.allocate_saved(operand)
+        
+        # Recargar desde memoria si se le hizo spill
+        if self.register_manager.needs_reload(operand, reg):
+            self._emit(f"lw {reg}, {self.register_manager.slot_for(operand)}")
+            self.register_manager.spilled.add(operand)
+        return reg
     
     def _get_or_allocate_register(self, var_name: str) -> str:
         """Obtiene o asigna un registro para una variable."""
@@ -633,12 +1216,15 @@ class MIPSGenerator:
         
         var_name = str(var_name)
         
+        # Se va a escribir: la copia en memoria (si la hay) deja de ser válida
+        self.register_manager.spilled.discard(var_name)
+        
         reg = self.register_manager.get_register(var_name)
         if reg:
             return reg
         
         # Asignar nuevo registro
-        if self.register_manager.is_temp_var(var_name):
+        if _classify(var_name).kind == Operand.TEMP:
             return self.register_manager.allocate_temp(var_name)
         else:
             return self.register_manager.allocate_saved(var_name)
@@ -660,39 +1246,197 @@ class MIPSGenerator:
             clean_string += '\\n'
         
         # Verificar si ya existe
-        for label, value in self.string_literals.items():
-            if value == clean_string:
-                return label
+        label = self._string_by_value.get(clean_string)
+        if label is not None:
+            return label
         
         # Crear nueva etiqueta
         label = f"str_{self.string_counter}"
         self.string_counter += 1
         
         # Guardar el string
-        self.string_literals[label] = clean_string
+        self._string_by_value[clean_string] = label
         
         # Agregar a la sección .data inmediatamente
         self.data_section.append(f'{label}: .asciiz "{clean_string}"')
         
         return label
     
+    def _peephole_pass(self):
+        """
+        Optimización peephole sobre self.code.
+        
+        Recorre las instrucciones (ignorando comentarios y etiquetas) con una
+        ventana deslizante y aplica _PEEPHOLE_RULES. Tras cada reescritura se
+        vuelve a examinar solo la ventana anterior, por lo que el pase es lineal.
+        """
+        code = self.code
+        instrs = [i for i, line in enumerate(code) if _is_instruction(line)]
+        
+        pos = 0
+        while pos < len(instrs):
+            for pattern, replacement, dead_group in self._PEEPHOLE_RULES:
+                size = pattern.pattern.count('\\n') + 1
+                if pos + size > len(instrs):
+                    continue
+                first, last = instrs[pos], instrs[pos + size - 1]
+                if any(line and line.endswith(':') for line in code[first:last]):
+                    continue  # la ventana no puede cruzar el destino de un salto
+                window = "\n".join(code[i] for i in instrs[pos:pos + size])
+                match = pattern.match(window)
+                if not match:
+                    continue
+                if dead_group and not _is_dead_after(code, instrs[pos + size - 1],
+                                                     match.group(dead_group)):
+                    continue
+                
+                lines = match.expand(replacement).split("\n") if replacement else []
+                window_indices = instrs[pos:pos + size]
+                for i, line in zip(window_indices, lines + [None] * (size - len(lines))):
+                    code[i] = line
+                del instrs[pos + len(lines):pos + size]
+                pos = max(pos - 1, 0)
+                break
+            else:
+                pos += 1
+        
+        self._remove_jumps_to_next(code)
+        code[:] = [line for line in code if line is not None]
+    
+    @staticmethod
+    def _remove_jumps_to_next(code: List[Optional[str]]):
+        """Elimina los "j L" seguidos directamente de la etiqueta L (p. ej. return antes de func_end:)."""
+        for i, line in enumerate(code):
+            if not line or not line.startswith("j "):
+                continue
+            target = f"{line[2:]}:"
+            for following in code[i + 1:]:
+                if following is None or not following or following[0] == '#':
+                    continue
+                if following == target:
+                    code[i] = None
+                    break
+                if not following.endswith(':'):
+                    break
+    
     def _assemble_program(self) -> str:
-        """Ensambla el programa completo con secciones .data y .text."""
-        program = []
+        """
+        Ensambla el programa completo con secciones .data y .text.
+        
+        Cada sección se escribe en un único buffer en lugar de copiarla a una
+        lista intermedia; self.code sigue siendo una lista hasta este punto
+        porque el peephole trabaja por línea.
+        """
+        buffer = io.StringIO()
+        write = buffer.write
         
         # Agregar sección de datos
-        program.extend(self.data_section)
+        write("\n".join(self.data_section))
         
         # Agregar variables globales
         for var_name, value in self.variables.items():
-            program.append(f"{var_name}: .word {value}")
+            write(f"\n{var_name}: .word {value}")
+        
+        # Agregar slots de spill
+        for slot in self.register_manager.spill_slots.values():
+            write(f"\n{slot}: .word 0")
         
-        program.append("")
+        write("\n\n")
         
         # Agregar sección de código
-        program.extend(self.code)
+        write("\n".join(self.code))
         
-        return "\n".join(program)
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=4096)
+def _classify(operand) -> Operand:
+    """
+    Clasifica un operando una sola vez; los cuádruplos repiten los mismos
+    nombres, así que las siguientes consultas salen de la caché.
+    """
+    text = str(operand)
+    if text.startswith('$'):
+        return Operand(Operand.REGISTER, text)
+    if _INT_LITERAL(text):
+        return Operand(Operand.LITERAL, text, int(text))
+    if _TEMP_NAME.match(text):
+        return Operand(Operand.TEMP, text)
+    return Operand(Operand.VAR, text)
+
+
+def _quad_reads(quad: Quadruple) -> List[str]:
+    """Nombres que lee un cuádruplo (en ARRAY_ASSIGN el result es la base del arreglo)."""
+    names = [str(arg) for arg in (quad.arg1, quad.arg2) if arg is not None]
+    if quad.op == QuadOp.ARRAY_ASSIGN and quad.result is not None:
+        names.append(str(quad.result))
+    return names
+
+
+def _is_int_literal(operand) -> bool:
+    """Indica si el operando es un literal entero (con signo opcional)."""
+    return operand is not None and _classify(operand).kind == Operand.LITERAL
+
+
+def _wrap32(value: int) -> int:
+    """Trunca un entero a 32 bits con signo, como lo haría la ALU de MIPS."""
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def _log2_literal(operand) -> Optional[int]:
+    """
+    Si el operando es un literal entero potencia de 2 positiva que cabe en
+    32 bits con signo (hasta 2^30), retorna su exponente. 2^31 ya es negativo
+    en un registro y desde 2^32 el corrimiento no cabe en el campo shamt.
+    """
+    if operand is None:
+        return None
+    op = _classify(operand)
+    value = op.int_value
+    if op.kind == Operand.LITERAL and 0 < value < 2 ** 31 and value & (value - 1) == 0:
+        return value.bit_length() - 1
+    return None
+
+
+def _is_instruction(line: Optional[str]) -> bool:
+    """Verifica si una línea de código es una instrucción (no comentario, etiqueta o directiva)."""
+    return bool(line) and line[0] not in '#.' and not line.endswith(':')
+
+
+def _is_dead_after(code: List[Optional[str]], index: int, reg: str) -> bool:
+    """
+    Verifica si el valor de un registro ya no se lee después de code[index].
+    
+    Recorre el bloque básico hacia adelante: el registro está muerto si se
+    escribe antes de leerse. Al llegar a una etiqueta, un salto o el final
+    del código se asume (conservadoramente) que sigue vivo.
+    """
+    for line in code[index + 1:]:
+        if line is None or not line or line[0] == '#' or line[0] == '.':
+            continue
+        if line.endswith(':'):
+            return False
+        
+        op, _, args = line.partition(' ')
+        if op == "syscall":
+            if reg in ("$v0", "$a0"):
+                return False
+            continue
+        
+        regs = _REGISTER.findall(args)
+        if op in _NO_DEST:
+            if reg in regs:
+                return False
+            if op in _CONTROL:
+                return False
+            continue
+        
+        if reg in regs[1:]:
+            return False
+        if regs and regs[0] == reg:
+            return True
+    return False
 
 
 # Ejemplo de uso
@@ -712,7 +1456,7 @@ if __name__ == "__main__":
     quads.add(QuadOp.PRINT, "c", None, None)
     
     # Generar código MIPS
-    generator = MIPSGenerator()
+    generator = MIPSGenerator(debug=True)
     mips_code = generator.generate(quads)
     
     print("=== Código MIPS Generado ===")
@@ -4,140 +4,273 @@ Gestor de registros MIPS.
 Maneja la asignación y liberación de registros temporales y salvados.
 """
 
-from typing import Optional, Set, Dict
+import heapq
+import re
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List
+
+# Nombres de temporales generados por el TempManager (t0, t1, ..., _t0)
+_TEMP_NAME = re.compile(r'_?t\d+$')
 
 
 class RegisterManager:
     """
-    Gestiona la asignación de registros MIPS.
+    Gestor de registros MIPS.
+    
+    Los temporales se asignan con linear scan: el generador informa el fin del
+    rango de vida de cada temporal (live_end) y en cada cuádruplo llama a
+    expire() para devolver al pool los registros cuyo rango ya terminó. Si el
+    pool se agota, se hace spill de la variable cuyo próximo uso está más lejos.
     
-    Registros disponibles:
-    - $t0-$t9: Registros temporales (10 registros)
-    - $s0-$s7: Registros salvados (8 registros)
-    - $v0-$v1: Valores de retorno
-    - $a0-$a3: Argumentos de función
+    Los spills y recargas se deciden en orden lineal. En modo reconciliado
+    (reconcile=True) cada frontera de bloque deja el mismo estado sin importar
+    por dónde se llegue: ningún valor en registros temporales, todos en su
+    slot (ver end_block).
     """
+    __slots__ = (
+        'temp_regs', 'saved_regs', 'arg_regs', '_temp_set', '_saved_set',
+        'temp_pool', 'saved_pool', '_temp_in_pool', '_saved_in_pool',
+        'var_to_reg', 'temp_count', 'live_end', 'uses', 'loop_heads', 'index', 'active',
+        'scratch', 'pinned', 'emit', 'spill_slots', 'spilled', 'reconcile',
+    )
     
-    def __init__(self):
-        # Registros temporales disponibles
-        self.temp_registers = [f"$t{i}" for i in range(10)]
+    def __init__(self, emit=None):
+        self.temp_regs = [f"$t{i}" for i in range(10)]  # $t0-$t9
+        self.saved_regs = [f"$s{i}" for i in range(8)]  # $s0-$s7
+        self.arg_regs = [f"$a{i}" for i in range(4)]    # $a0-$a3
+        self._temp_set = frozenset(self.temp_regs)
+        self._saved_set = frozenset(self.saved_regs)
         
-        # Registros salvados disponibles
-        self.saved_registers = [f"$s{i}" for i in range(8)]
+        # Pools de registros libres (deque) con un set paralelo para pertenencia O(1)
+        self.temp_pool = deque(self.temp_regs)
+        self.saved_pool = deque(self.saved_regs)
+        self._temp_in_pool = set(self.temp_regs)
+        self._saved_in_pool = set(self.saved_regs)
         
-        # Registros actualmente en uso
-        self.used_temps: Set[str] = set()
-        self.used_saved: Set[str] = set()
+        self.var_to_reg = {}
+        self.temp_count = 0
         
-        # Mapeo de variables/temporales a registros
-        self.var_to_reg: Dict[str, str] = {}
+        # Linear scan
+        self.live_end: Dict[str, int] = {}  # variable -> índice de su último uso
+        self.uses: Dict[str, List[int]] = {}  # variable -> índices (ordenados) donde se lee
+        self.loop_heads: Dict[str, int] = {}  # variable -> cabeza del ciclo hasta cuyo salto se extendió su rango
+        self.index = 0                      # cuádruplo que se está traduciendo
+        self.active: List[tuple] = []       # heap de (fin, variable) con registro asignado
+        self.scratch = set()                # registros sin variable del cuádruplo actual
+        self.pinned = set()                 # operandos del cuádruplo actual (no se hace spill)
         
-        # Registros especiales
-        self.zero = "$zero"  # Siempre 0
-        self.sp = "$sp"      # Stack pointer
-        self.fp = "$fp"      # Frame pointer
-        self.ra = "$ra"      # Return address
-        self.v0 = "$v0"      # Return value / syscall
-        self.v1 = "$v1"      # Return value
-        self.a0 = "$a0"      # Argument 1
-        self.a1 = "$a1"      # Argument 2
-        self.a2 = "$a2"      # Argument 3
-        self.a3 = "$a3"      # Argument 4
-    
-    def allocate_temp(self, var_name: Optional[str] = None) -> str:
-        """
-        Asigna un registro temporal.
-        
-        Args:
-            var_name: Nombre de la variable/temporal (opcional)
-            
-        Returns:
-            Nombre del registro asignado (ej: "$t0")
-            
-        Raises:
-            RuntimeError: Si no hay registros temporales disponibles
-        """
-        # Si la variable ya tiene un registro asignado, retornarlo
+        # Spilling
+        self.emit = emit                    # callback para emitir sw de spill
+        self.spill_slots: Dict[str, str] = {}  # variable -> etiqueta de su slot en .data
+        self.spilled = set()                # variables cuyo slot en memoria tiene el valor vigente (en el bloque actual)
+        self.reconcile = False              # guardar los registros temporales en cada frontera de bloque
+    
+    def reset(self):
+        """Reinicia el gestor"""
+        self.temp_pool = deque(self.temp_regs)
+        self.saved_pool = deque(self.saved_regs)
+        self._temp_in_pool = set(self.temp_regs)
+        self._saved_in_pool = set(self.saved_regs)
+        self.var_to_reg.clear()
+        self.temp_count = 0
+        self.live_end.clear()
+        self.uses.clear()
+        self.loop_heads.clear()
+        self.index = 0
+        self.active.clear()
+        self.scratch.clear()
+        self.pinned.clear()
+        self.spill_slots.clear()
+        self.spilled.clear()
+        self.reconcile = False
+    
+    def allocate_temp(self, var_name=None):
+        """Asigna un registro temporal"""
         if var_name and var_name in self.var_to_reg:
             return self.var_to_reg[var_name]
         
-        # Buscar un registro temporal libre
-        for reg in self.temp_registers:
-            if reg not in self.used_temps:
-                self.used_temps.add(reg)
-                if var_name:
-                    self.var_to_reg[var_name] = reg
-                return reg
+        if self.temp_pool:
+            reg = self.temp_pool.popleft()
+            self._temp_in_pool.discard(reg)
+        else:
+            reg = self._spill()
         
-        # Si no hay registros libres, usar spilling (guardar en memoria)
-        raise RuntimeError("No hay registros temporales disponibles. Implementar spilling.")
+        if var_name:
+            self._bind(var_name, reg)
+        else:
+            self.scratch.add(reg)
+        
+        return reg
     
-    def allocate_saved(self, var_name: str) -> str:
+    def allocate_saved(self, var_name):
+        """Asigna un registro guardado"""
+        if var_name in self.var_to_reg:
+            return self.var_to_reg[var_name]
+        
+        if not self.saved_pool:
+            # Si no hay registros disponibles, usar temporales
+            return self.allocate_temp(var_name)
+        
+        reg = self.saved_pool.popleft()
+        self._saved_in_pool.discard(reg)
+        self._bind(var_name, reg)
+        return reg
+    
+    def _bind(self, var_name, reg):
+        """Asocia una variable a un registro y la agrega a los intervalos activos."""
+        self.var_to_reg[var_name] = reg
+        end = self.live_end.get(var_name)
+        if end is not None:
+            heapq.heappush(self.active, (end, var_name))
+    
+    def rename(self, old_var, new_var):
+        """Transfiere el registro de old_var a new_var."""
+        reg = self.var_to_reg.pop(old_var)
+        self.spilled.discard(new_var)
+        self._bind(new_var, reg)
+    
+    def _spill(self):
+        """
+        Libera un registro temporal guardando en memoria la variable cuyo
+        próximo uso está más lejos (las que no se vuelven a leer en el orden
+        lineal, o que no tienen usos registrados, van primero).
         """
-        Asigna un registro salvado para una variable.
+        candidates = [var for var, reg in self.var_to_reg.items()
+                      if reg in self._temp_set and var not in self.pinned]
+        if not candidates or self.emit is None:
+            # Reusar un registro ocupado mezclaría dos valores vivos
+            raise RuntimeError("No hay registros temporales disponibles para hacer spill")
         
-        Args:
-            var_name: Nombre de la variable
-            
-        Returns:
-            Nombre del registro asignado (ej: "$s0")
-            
-        Raises:
-            RuntimeError: Si no hay registros salvados disponibles
+        victim = max(candidates, key=self._next_use)
+        reg = self.var_to_reg.pop(victim)
+        if victim in self.spilled:
+            # Se recargó en este bloque y no se ha redefinido: el slot sigue vigente
+            return reg
+        self._store(victim, reg)
+        return reg
+    
+    def _store(self, var_name, reg):
+        """Emite el sw de la variable a su slot y lo marca como vigente."""
+        self.emit(f"sw {reg}, {self.slot_for(var_name)}")
+        self.spilled.add(var_name)
+    
+    def slot_for(self, var_name):
+        """Etiqueta del slot en .data de la variable (se crea la primera vez)."""
+        slot = self.spill_slots.get(var_name)
+        if slot is None:
+            slot = f"spill_{len(self.spill_slots)}"
+            self.spill_slots[var_name] = slot
+        return slot
+    
+    def needs_reload(self, var_name, reg):
+        """Indica si la variable recién asignada a reg debe cargarse desde su slot."""
+        if self.reconcile:
+            # En modo reconciliado un valor sin registro vive en su slot (ver end_block)
+            return reg in self._temp_set or var_name in self.spill_slots
+        return var_name in self.spilled
+    
+    def end_block(self):
         """
-        # Si la variable ya tiene un registro asignado, retornarlo
-        if var_name in self.var_to_reg:
-            return self.var_to_reg[var_name]
+        Frontera de bloque básico (etiqueta, o justo antes de un salto).
         
-        # Buscar un registro salvado libre
-        for reg in self.saved_registers:
-            if reg not in self.used_saved:
-                self.used_saved.add(reg)
-                self.var_to_reg[var_name] = reg
-                return reg
+        En modo reconciliado guarda en su slot cada valor vivo que está en un
+        registro temporal y lo desasocia: así el estado en una etiqueta es el
+        mismo por fall-through que por cualquier salto, y un spill dentro de
+        un ciclo o de una rama no deja valores en registros que otro camino
+        no escribió. El siguiente uso del valor lo recarga.
         
-        raise RuntimeError("No hay registros salvados disponibles. Implementar spilling.")
-    
-    def free_temp(self, reg: str):
-        """Libera un registro temporal."""
-        if reg in self.used_temps:
-            self.used_temps.remove(reg)
-            # Remover del mapeo de variables
-            for var, r in list(self.var_to_reg.items()):
-                if r == reg:
-                    del self.var_to_reg[var]
-    
-    def free_saved(self, reg: str):
-        """Libera un registro salvado."""
-        if reg in self.used_saved:
-            self.used_saved.remove(reg)
-            # Remover del mapeo de variables
-            for var, r in list(self.var_to_reg.items()):
-                if r == reg:
-                    del self.var_to_reg[var]
-    
-    def get_register(self, var_name: str) -> Optional[str]:
+        spilled se vacía en cada frontera: una recarga o redefinición en una
+        rama no dice nada del otro camino, así que la marca de slot vigente
+        solo vale para valores recargados dentro del bloque actual.
+        """
+        if not self.reconcile:
+            return
+        for var, reg in list(self.var_to_reg.items()):
+            if reg not in self._temp_set:
+                continue
+            if var not in self.spilled and not self._is_dead(var):
+                self._store(var, reg)
+            del self.var_to_reg[var]
+            self._release(reg)
+        self.spilled.clear()
+    
+    def _next_use(self, var_name):
         """
-        Obtiene el registro asignado a una variable.
+        Índice de la siguiente lectura de la variable desde el cuádruplo actual.
         
-        Args:
-            var_name: Nombre de la variable
-            
-        Returns:
-            Nombre del registro o None si no está asignado
+        Si ya no hay lecturas adelante pero el rango se extendió hasta un salto
+        hacia atrás, la siguiente lectura es la primera desde la cabeza del
+        ciclo, ya en la siguiente iteración (después del salto).
         """
+        uses = self.uses.get(var_name)
+        if not uses:
+            return float('inf')
+        position = bisect_left(uses, self.index)
+        if position < len(uses):
+            return uses[position]
+        
+        head = self.loop_heads.get(var_name)
+        end = self.live_end.get(var_name, -1)
+        if head is not None and end >= self.index:
+            position = bisect_left(uses, head)
+            if position < len(uses):
+                return end + 1 + uses[position] - head
+        return float('inf')
+    
+    def _is_dead(self, var_name):
+        """Indica si el temporal ya no se lee después del cuádruplo actual."""
+        end = self.live_end.get(var_name)
+        if end is None or end > self.index:
+            return False
+        # Un rango extendido termina en el salto hacia atrás, que lo vuelve a necesitar
+        return var_name not in self.loop_heads
+    
+    def expire(self, index):
+        """Libera los registros de trabajo y los de intervalos que terminan antes de index."""
+        self.index = index
+        scratch, self.scratch = self.scratch, set()
+        for reg in scratch:
+            self._release(reg)
+        
+        active = self.active
+        while active and active[0][0] < index:
+            end, var = heapq.heappop(active)
+            reg = self.var_to_reg.get(var)
+            if reg is not None and self.live_end.get(var) == end:
+                del self.var_to_reg[var]
+                self._release(reg)
+    
+    def _release(self, reg):
+        """Devuelve un registro a su pool."""
+        if reg in self._temp_set:
+            self.free_temp(reg)
+        elif reg in self._saved_set:
+            self.free_saved(reg)
+    
+    def get_register(self, var_name):
+        """Obtiene el registro asignado a una variable"""
         return self.var_to_reg.get(var_name)
     
-    def is_register(self, name: str) -> bool:
-        """Verifica si un nombre es un registro MIPS."""
-        return name.startswith("$")
+    def free_temp(self, reg):
+        """Libera un registro temporal"""
+        self.scratch.discard(reg)
+        if reg in self._temp_set and reg not in self._temp_in_pool:
+            self.temp_pool.append(reg)
+            self._temp_in_pool.add(reg)
     
-    def is_temp_var(self, name: str) -> bool:
-        """Verifica si un nombre es una variable temporal (t0, t1, etc)."""
-        return name.startswith("t") and name[1:].isdigit()
+    def free_saved(self, reg):
+        """Libera un registro guardado"""
+        if reg in self._saved_set and reg not in self._saved_in_pool:
+            self.saved_pool.append(reg)
+            self._saved_in_pool.add(reg)
     
-    def reset(self):
-        """Reinicia el gestor de registros."""
-        self.used_temps.clear()
-        self.used_saved.clear()
-        self.var_to_reg.clear()
+    @staticmethod
+    def is_register(operand):
+        """Verifica si es un registro"""
+        return operand[:1] == '$'
+    
+    @staticmethod
+    def is_temp_var(var_name):
+        """Verifica si es una variable temporal"""
+        return _TEMP_NAME.match(var_name) is not None
@@ -1,39 +1,12 @@
 import sys  # Importamos el módulo sys para manejar argumentos de línea de comandos
-from antlr4 import *  # Importamos las clases de antlr4 para el procesamiento de gramáticas
-from CompiscriptLexer import CompiscriptLexer  # Importamos el lexer generado por ANTLR para la gramática
-from CompiscriptParser import CompiscriptParser  # Importamos el parser generado por ANTLR para la gramática
-from antlr4.error.ErrorListener import ErrorListener  # Importamos la clase ErrorListener para manejar errores
-from semantic.sema_visitor import SemaVisitor  # Importamos el visitante semántico que analizará el árbol
-from semantic.errors import SemanticError  # Importamos la clase de errores semánticos que se pueden generar
+from pathlib import Path  # Para ubicar la carpeta src/ a partir de este archivo
 
+# Driver.py se ejecuta como script desde su carpeta: agregamos src/ para importar los paquetes del proyecto
+SRC_DIR = Path(__file__).resolve().parent.parent.parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
 
-# Definimos una clase para recopilar los errores sintácticos
-class CollectingErrorListener(ErrorListener):
-    def __init__(self):
-        super().__init__()  # Llamamos al constructor de la clase base ErrorListener
-        self.errors = []  # Lista para almacenar los errores
-
-    # Método sobrescrito para capturar los errores de sintaxis
-    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        text = getattr(offendingSymbol, 'text', '<EOF>')  # Obtenemos el texto del símbolo que causó el error (si no tiene, usamos <EOF>)
-        # Almacenamos la información del error en la lista
-        self.errors.append({
-            "line": line,  # Línea donde ocurrió el error
-            "column": column,  # Columna donde ocurrió el error
-            "text": text,  # El texto del símbolo que causó el error
-            "msg": msg  # El mensaje del error
-        })
-
-    # Verifica si existen errores
-    def has_errors(self):
-        return len(self.errors) > 0  # Retorna True si hay errores
-
-    # Método para generar un reporte de los errores
-    def report(self):
-        return "\n".join(
-            f"[Sintáctico] línea {e['line']}, col {e['column']}: cerca de '{e['text']}' → {e['msg']}"
-            for e in self.errors  # Por cada error, generamos un mensaje detallado
-        )
+from parsing.antlr.parser_builder import build_from_file  # Lexer, parser y análisis en dos etapas (SLL y, si falla, LL)
 
 
 # Función principal que maneja el flujo del programa
@@ -43,26 +16,21 @@ def main(argv):
         print("Uso: python Driver.py <archivo.cps>")  # Si no se pasa el archivo, mostramos el mensaje de uso
         sys.exit(1)  # Salimos del programa con código de error 1
 
-    input_stream = FileStream(argv[1], encoding="utf-8")  # Leemos el archivo de entrada (en formato cps)
-
-    lexer = CompiscriptLexer(input_stream)  # Creamos el lexer (analizador léxico) para tokenizar el archivo
-    tokens = CommonTokenStream(lexer)  # Generamos un flujo de tokens a partir del lexer
-
-    parser = CompiscriptParser(tokens)  # Creamos el parser (analizador sintáctico) para generar el árbol de análisis
-    parser.removeErrorListeners()  # Eliminamos cualquier listener de error por defecto
-    err = CollectingErrorListener()  # Creamos nuestro listener personalizado para recopilar los errores
-    parser.addErrorListener(err)  # Agregamos nuestro listener al parser
-
-    tree = parser.program()  # Comenzamos el análisis sintáctico, generando el árbol de sintaxis
+    res = build_from_file(argv[1])  # Leemos y analizamos el archivo de entrada (en formato cps)
+    tree = res.tree  # Árbol de sintaxis generado por el parser
 
     # --- Sintaxis ---
-    if err.has_errors():  # Si hubo errores sintácticos
-        print(err.report())  # Imprimimos el reporte de los errores
+    if res.errors:  # Si hubo errores sintácticos
+        print("\n".join(str(e) for e in res.errors))  # Imprimimos el reporte de los errores
         sys.exit(2)  # Salimos con código de error 2 (error de sintaxis)
     else:
         print("✔ Sintaxis OK")  # Si no hubo errores, informamos que la sintaxis está correcta
 
     # --- Semántica ---
+    # Se importa aquí para que el uso sin argumentos y los errores de sintaxis no carguen el paquete semántico
+    from semantic.sema_visitor import SemaVisitor  # Importamos el visitante semántico que analizará el árbol
+    from semantic.errors import SemanticError  # Importamos la clase de errores semánticos que se pueden generar
+
     try:
         sema = SemaVisitor()  # Creamos un visitante semántico
         sema.visit(tree)  # Visitamos el árbol de sintaxis para analizar semánticamente el código
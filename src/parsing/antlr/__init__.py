@@ -1,2 +1,2 @@
 # src/parsing/antlr/__init__.py
-from .parser_builder import build_from_text, parse_from_string, ParseResult
+from .parser_builder import build_from_text, parse_from_string, reset_caches, ParseResult
@@ -6,6 +6,7 @@ class CollectingErrorListener(ErrorListener):
     def __init__(self):
         super().__init__()  # Llamamos al constructor de la clase base ErrorListener
         self.errors = []  # Lista para almacenar los errores detectados
+        self.messages = []  # Mensajes ya formateados, uno por error (se arman una sola vez)
 
     # Método sobrescrito para capturar los errores de sintaxis
     def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
@@ -13,7 +14,9 @@ class CollectingErrorListener(ErrorListener):
         # 'msg' es el mensaje de error, 'e' es la excepción que se generó (puede no ser usada aquí)
         text = getattr(offendingSymbol, 'text', '<EOF>')  # Obtenemos el texto del símbolo que causó el error
         # Agregamos un objeto 'SyntaxDiagnostic' a la lista de errores, con los detalles del error
-        self.errors.append(SyntaxDiagnostic(line, column, text, msg))
+        diagnostic = SyntaxDiagnostic(line, column, text, msg)
+        self.errors.append(diagnostic)
+        self.messages.append(str(diagnostic))  # Formateamos el mensaje en este momento
 
     # Método para verificar si hay errores
     def has_errors(self):
@@ -21,11 +24,8 @@ class CollectingErrorListener(ErrorListener):
 
     # Método para generar un reporte de los errores de sintaxis
     def report(self):
-        # Iteramos sobre todos los errores almacenados y los formateamos como una cadena
-        return "\n".join(
-            f"[Sintáctico] línea {e.line}, col {e.column}: cerca de '{e.text}' → {e.msg}"
-            for e in self.errors  # Cada error es un objeto 'SyntaxDiagnostic'
-        )
+        # Unimos los mensajes formateados al capturar cada error
+        return "\n".join(self.messages)
 
 # Clase que define la estructura de un error de sintaxis
 @dataclass
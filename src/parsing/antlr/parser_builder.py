@@ -1,10 +1,15 @@
 from __future__ import annotations  # Importación para usar anotaciones de tipo como cadenas (compatibilidad futura)
 from dataclasses import dataclass  # Importamos el decorador para crear clases con atributos automáticamente
-from typing import Optional, Tuple, Union  # Importamos tipos para anotaciones de tipo
+from typing import Dict, Optional, Tuple, Union  # Importamos tipos para anotaciones de tipo
+import hashlib  # Para calcular el hash del contenido usado como clave de caché
 from pathlib import Path  # Importación para trabajar con rutas de archivo
 
 # Importaciones de ANTLR, que es la herramienta para generar analizadores sintácticos
 from antlr4 import InputStream, FileStream, CommonTokenStream, ParserRuleContext
+from antlr4.dfa.DFA import DFA  # Autómata de predicción que ANTLR construye bajo demanda
+from antlr4.atn.PredictionMode import PredictionMode  # Modos de predicción del parser (SLL rápido, LL completo)
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy  # Estrategias de manejo de errores
+from antlr4.error.Errors import ParseCancellationException  # Excepción que lanza BailErrorStrategy al primer error
 
 # Importación de nuestras clases personalizadas de errores y análisis léxico/sintáctico
 from .error_listener import CollectingErrorListener, SyntaxDiagnostic
@@ -18,12 +23,42 @@ class ParseResult:
     tree: ParserRuleContext  # El árbol de análisis sintáctico
     parser: CompiscriptParser  # El parser usado
     tokens: CommonTokenStream  # Los tokens generados por el lexer
-    errors: list[SyntaxDiagnostic]  # Errores de sintaxis (si los hay)
+    errors: Tuple[SyntaxDiagnostic, ...]  # Errores de sintaxis (si los hay); tupla porque el resultado se comparte desde la caché
 
     # Método que devuelve True si no hay errores, False si los hay
     def ok(self) -> bool:
         return not self.errors
 
+# Caché en memoria de resultados de análisis: (clave de la fuente, regla de entrada) -> ParseResult
+# Un acierto devuelve el mismo ParseResult (árbol, parser y tokens incluidos) a todos los llamadores: no deben
+# modificarlo. Los errores son una tupla y el analizador semántico no anota los nodos del árbol.
+_PARSE_CACHE: Dict[tuple, ParseResult] = {}
+_PARSE_CACHE_SIZE = 32  # Número máximo de resultados guardados (se descarta el más antiguo)
+
+# Límite de contextos de predicción compartidos a partir del cual se vacían las cachés de ANTLR
+_MAX_SHARED_CONTEXTS = 100_000
+
+# Función que vacía las cachés de ANTLR (DFA del lexer y del parser, contextos compartidos) y la de resultados
+def reset_caches() -> None:
+    # Las listas se reemplazan en su lugar porque los simuladores ya creados guardan una referencia a ellas
+    for recognizer in (CompiscriptLexer, CompiscriptParser):
+        recognizer.decisionsToDFA[:] = [DFA(ds, i) for i, ds in enumerate(recognizer.atn.decisionToState)]
+    CompiscriptParser.sharedContextCache.cache.clear()
+    _PARSE_CACHE.clear()
+
+# Función que guarda un resultado en la caché, descartando el más antiguo si está llena
+def _remember(key: tuple, res: ParseResult) -> ParseResult:
+    if len(_PARSE_CACHE) >= _PARSE_CACHE_SIZE:
+        del _PARSE_CACHE[next(iter(_PARSE_CACHE))]  # Los dict conservan el orden de inserción
+    _PARSE_CACHE[key] = res
+    return res
+
+# Función que lanza SyntaxError si se solicitó y el resultado tiene errores
+def _check(res: ParseResult, raise_on_error: bool) -> ParseResult:
+    if raise_on_error and res.errors:  # Si hay errores y se ha solicitado lanzarlos
+        raise SyntaxError("\n".join(str(e) for e in res.errors))  # Lanza una excepción con los errores
+    return res
+
 # Función que configura el lexer, el parser y el manejador de errores
 def _configure(input_stream) -> Tuple[CompiscriptLexer, CompiscriptParser, CommonTokenStream, CollectingErrorListener]:
     lexer = CompiscriptLexer(input_stream)  # Crea el lexer a partir del flujo de entrada
@@ -42,6 +77,39 @@ def _configure(input_stream) -> Tuple[CompiscriptLexer, CompiscriptParser, Commo
 
     return lexer, parser, tokens, err  # Devuelve los objetos configurados
 
+# Función que obtiene el método del parser asociado a la regla de entrada
+def _entry_rule(parser: CompiscriptParser, entry_rule: str):
+    if entry_rule == "program":  # Caso común: llamada directa, sin búsqueda por nombre
+        return parser.program
+    rule_fn = getattr(parser, entry_rule, None)  # Otra regla pedida explícitamente por el llamador
+    if rule_fn is None:  # Verifica que la regla de entrada exista en el parser
+        raise AttributeError(f"Entry rule '{entry_rule}' no existe en CompiscriptParser.")
+    return rule_fn
+
+# Función que ejecuta la regla de entrada en dos etapas: SLL (rápida) y, si falla, LL completo
+def _run_two_stage(parser: CompiscriptParser, tokens: CommonTokenStream, err: CollectingErrorListener, rule_fn) -> ParserRuleContext:
+    # Primer intento con predicción SLL, abortando en el primer error y sin reportarlo
+    parser.removeErrorListeners()
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    try:
+        return rule_fn()  # En el caso común (entrada válida) termina aquí
+    except ParseCancellationException:
+        # SLL no bastó o la entrada tiene errores: reanalizamos con LL completo para reportarlos
+        tokens.seek(0)  # Volvemos al primer token (los tokens ya están en el buffer, el lexer no se repite)
+        parser.reset()  # Reiniciamos el estado del parser
+        parser._interp.predictionMode = PredictionMode.LL
+        parser._errHandler = DefaultErrorStrategy()
+        parser.addErrorListener(err)  # Solo el análisis LL reporta errores a nuestro listener
+        return rule_fn()
+
+# Núcleo común: configura lexer y parser sobre el flujo de entrada y construye el árbol
+def _parse(input_stream: InputStream, entry_rule: str = "program") -> ParseResult:
+    _, parser, tokens, err = _configure(input_stream)  # Configura el lexer, parser y el listener de errores
+    rule_fn = _entry_rule(parser, entry_rule)  # Obtiene la función asociada a la regla de entrada
+    tree = _run_two_stage(parser, tokens, err, rule_fn)  # Construye el árbol de análisis sintáctico (SLL y, si falla, LL)
+    return ParseResult(tree=tree, parser=parser, tokens=tokens, errors=tuple(err.errors))  # Devuelve los resultados del análisis
+
 # Función para construir el árbol de análisis sintáctico a partir de un código fuente (en texto)
 def build_from_text(
     code: str,  # Código fuente como cadena de texto
@@ -49,21 +117,14 @@ def build_from_text(
     entry_rule: str = "program",  # Regla de entrada (normalmente "program")
     raise_on_error: bool = False,  # Si True, lanza una excepción si hay errores
 ) -> ParseResult:
-    input_stream = InputStream(code)  # Crea un flujo de entrada a partir del código
-    _, parser, tokens, err = _configure(input_stream)  # Configura el lexer, parser y el listener de errores
-
-    # Verifica que la regla de entrada exista en el parser
-    if not hasattr(parser, entry_rule):
-        raise AttributeError(f"Entry rule '{entry_rule}' no existe en CompiscriptParser.")
-    
-    rule_fn = getattr(parser, entry_rule)  # Obtiene la función asociada a la regla de entrada
-    tree = rule_fn()  # Llama a la función para construir el árbol de análisis sintáctico
-
-    errors = err.errors  # Obtiene los errores de sintaxis del listener
-    if raise_on_error and errors:  # Si hay errores y se ha solicitado lanzarlos
-        raise SyntaxError("\n".join(str(e) for e in errors))  # Lanza una excepción con los errores
+    # Si el mismo código ya se analizó, devolvemos el resultado guardado sin volver a parsear
+    key = ("text", hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest(), entry_rule)
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        return _check(cached, raise_on_error)
 
-    return ParseResult(tree=tree, parser=parser, tokens=tokens, errors=errors)  # Devuelve los resultados del análisis
+    res = _parse(InputStream(code), entry_rule)  # Analiza el código a partir de un flujo de entrada en memoria
+    return _check(_remember(key, res), raise_on_error)  # Lo guarda en la caché y lo devuelve (o lanza los errores)
 
 # Función para construir el árbol de análisis sintáctico a partir de un archivo
 def build_from_file(
@@ -73,54 +134,38 @@ def build_from_file(
     encoding: Optional[str] = "utf-8",  # Codificación del archivo
     raise_on_error: bool = False,  # Si True, lanza una excepción si hay errores
 ) -> ParseResult:
-    input_stream = FileStream(str(path), encoding=encoding)  # Crea un flujo de entrada desde el archivo
-    _, parser, tokens, err = _configure(input_stream)  # Configura el lexer, parser y el listener de errores
+    # Un archivo sin cambios (misma ruta, fecha de modificación y tamaño) no se vuelve a leer ni a parsear
+    st = Path(path).stat()
+    key = ("file", str(Path(path).resolve()), st.st_mtime_ns, st.st_size, encoding, entry_rule)
+    cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        return _check(cached, raise_on_error)
 
-    # Verifica que la regla de entrada exista en el parser
-    if not hasattr(parser, entry_rule):
-        raise AttributeError(f"Entry rule '{entry_rule}' no existe en CompiscriptParser.")
-    
-    rule_fn = getattr(parser, entry_rule)  # Obtiene la función asociada a la regla de entrada
-    tree = rule_fn()  # Llama a la función para construir el árbol de análisis sintáctico
+    # Al compilar muchos archivos seguidos las cachés de ANTLR crecen sin límite: las vaciamos al pasar el umbral
+    if len(CompiscriptParser.sharedContextCache) > _MAX_SHARED_CONTEXTS:
+        reset_caches()
 
-    errors = err.errors  # Obtiene los errores de sintaxis del listener
-    if raise_on_error and errors:  # Si hay errores y se ha solicitado lanzarlos
-        raise SyntaxError("\n".join(str(e) for e in errors))  # Lanza una excepción con los errores
-
-    return ParseResult(tree=tree, parser=parser, tokens=tokens, errors=errors)  # Devuelve los resultados del análisis
+    res = _parse(FileStream(str(path), encoding=encoding), entry_rule)  # Analiza el archivo
+    return _check(_remember(key, res), raise_on_error)  # Lo guarda en la caché y lo devuelve (o lanza los errores)
 
 # Función de alto nivel para construir el árbol de análisis sintáctico desde una cadena o archivo
 def build_parse_tree(source: Union[str, Path]):
-    p = Path(str(source))  # Convierte la fuente en un objeto Path
+    # Una cadena con saltos de línea (o muy larga) es código fuente: no consultamos el sistema de archivos
+    is_file = isinstance(source, Path) or ("\n" not in source and len(source) < 4096 and Path(source).exists())
     # Si la fuente es un archivo que existe, construye el árbol desde el archivo; si no, desde el texto
-    res = build_from_file(p) if p.exists() else build_from_text(str(source))
+    res = build_from_file(source) if is_file else build_from_text(str(source))
     return (res.tree, res.tokens, res.parser)  # Devuelve el árbol, los tokens y el parser
 
 # Función para analizar el código desde un flujo de entrada
 def parse_from_stream(stream: InputStream):
-    _, parser, tokens, _ = _configure(stream)  # Configura el lexer, parser y tokens desde el flujo de entrada
-    tree = getattr(parser, "program")()  # Llama a la regla de entrada "program" para construir el árbol
-    return (tree, tokens, parser)  # Devuelve el árbol, los tokens y el parser
+    res = _parse(stream)  # Analiza el flujo con la regla de entrada "program"
+    return (res.tree, res.tokens, res.parser)  # Devuelve el árbol, los tokens y el parser
 
-# Función para analizar el código desde una cadena de texto
+# Función para analizar el código desde una cadena de texto (equivale a build_from_text)
 def parse_from_string(
     code: str,
     *,
     entry_rule: str = "program",  # Regla de entrada
     raise_on_error: bool = False,  # Si True, lanza una excepción si hay errores
-) -> ParsingResult:
-    input_stream = InputStream(code)  # Crea un flujo de entrada a partir del código
-    _, parser, tokens, error_listener = _initialize_parser(input_stream)  # Configura el lexer, parser y tokens
-
-    # Verifica que la regla de entrada exista en el parser
-    if not hasattr(parser, entry_rule):
-        raise AttributeError(f"La regla de entrada '{entry_rule}' no existe en CompiscriptParser.")
-    
-    parse_function = getattr(parser, entry_rule)  # Obtiene la función asociada a la regla de entrada
-    tree = parse_function()  # Llama a la función para construir el árbol de análisis sintáctico
-
-    errors = error_listener.errors  # Obtiene los errores del listener
-    if raise_on_error and errors:  # Si hay errores y se ha solicitado lanzarlos
-        raise SyntaxError("\n".join(str(error) for error in errors))  # Lanza una excepción con los errores
-
-    return ParseResult(tree=tree, parser=parser, tokens=tokens, errors=errors)  # Devuelve los resultados del análisis
+) -> ParseResult:
+    return build_from_text(code, entry_rule=entry_rule, raise_on_error=raise_on_error)
@@ -7,12 +7,15 @@ from .checker import analyze, CompiscriptSemanticVisitor
 from .symbols import Symbol, VariableSymbol, FunctionSymbol, ClassSymbol, ParamSymbol
 from .symbol_table import SymbolTable, Scope
 from .types import (
-    is_numeric,
-    is_boolean,
-    are_compatible,
+    Type,
+    INT, FLOAT, BOOL, STR, NULL, VOID,
+    ArrayType,
+    ClassType,
+    is_array,
+    is_class,
     get_array_element_type,
+    get_class_name,
     create_array_type,
-    get_type_size
 )
 from .diagnostics import Diagnostics
 
@@ -35,12 +38,15 @@ __all__ = [
     'Scope',
     
     # Tipos
-    'is_numeric',
-    'is_boolean',
-    'are_compatible',
+    'Type',
+    'INT', 'FLOAT', 'BOOL', 'STR', 'NULL', 'VOID',
+    'ArrayType',
+    'ClassType',
+    'is_array',
+    'is_class',
     'get_array_element_type',
+    'get_class_name',
     'create_array_type',
-    'get_type_size',
     
     # Diagnósticos
     'Diagnostics',
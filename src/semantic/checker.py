@@ -1,12 +1,13 @@
 from __future__ import annotations
 from typing import Optional, List, Tuple, Dict
 from dataclasses import dataclass
+from weakref import WeakKeyDictionary
 
 from antlr4 import ParserRuleContext, Token
 from parsing.antlr.CompiscriptVisitor import CompiscriptVisitor
 from parsing.antlr.CompiscriptParser import CompiscriptParser
 
-from .types import INT, BOOL, STR, NULL, VOID, FLOAT, ArrayType, ClassType, Type
+from .types import INT, BOOL, STR, NULL, VOID, FLOAT, ArrayType, ClassType, Type, create_array_type
 from .symbols import VariableSymbol, FunctionSymbol, ClassSymbol, ParamSymbol, Symbol
 from .symbol_table import SymbolTable
 from .diagnostics import Diagnostics
@@ -18,6 +19,11 @@ def where(ctx: ParserRuleContext) -> tuple[int, int]:
 # Marker para statements que terminan el flujo (return/break/continue)
 TERMINATED = object() 
 
+# Tablas precalculadas de tipos numéricos: una sola búsqueda por hash en vez de varias comparaciones
+_NUMERIC = frozenset((INT, FLOAT))
+# (izquierdo, derecho) -> tipo del resultado; Int op Int -> Int, cualquier mezcla con Float -> Float
+_NUM_RESULT = {(INT, INT): INT, (INT, FLOAT): FLOAT, (FLOAT, INT): FLOAT, (FLOAT, FLOAT): FLOAT}
+
 class CompiscriptSemanticVisitor(CompiscriptVisitor):
     """
     Visitor semántico para Compiscript.g4 con:
@@ -43,7 +49,10 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
 
     def error(self, code: str, msg: str, ctx: ParserRuleContext, **extra):
         line, col = where(ctx)
-        self.diag.add(phase="semantic", code=code, message=msg, line=line, col=col, **extra)
+        if extra:
+            self.diag.add_extra("semantic", code, msg, line, col, extra)
+        else:
+            self.diag.add("semantic", code, msg, line, col)
 
     def define_var(self, name: str, typ: Type, ctx: ParserRuleContext, *, is_const: bool = False):
         try:
@@ -471,17 +480,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
     def _apply_call(self, parent_ctx, sop, cur_type, cur_sym=None):
         args = [self.visit(e) for e in (sop.arguments().expression() or [])] if sop.arguments() else []
 
-        fsym = getattr(sop, "_method_symbol", None)
-        if fsym is not None:
-            if len(args) != len(fsym.params):
-                self.error("E102", f"Argumentos incompatibles: esperaba {len(fsym.params)}, recibió {len(args)}", sop)
-            else:
-                for i, (at, p) in enumerate(zip(args, fsym.params)):
-                    if at != p.type:
-                        self.error("E102", f"Parametro {i+1}: esperaba {p.type}, recibió {at}", sop)
-            return fsym.type, None
-
-        # funciones globales
+        # funciones globales y métodos (`_apply_member` devuelve el FunctionSymbol del método como cur_sym)
         if isinstance(cur_sym, FunctionSymbol):
             if len(args) != len(cur_sym.params):
                 self.error("E102", f"Argumentos incompatibles: esperaba {len(cur_sym.params)}, recibió {len(args)}", sop)
@@ -514,7 +513,6 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
                 return ft, None
             ms = self._lookup_method_symbol(cur_type, member)
             if ms is not None:
-                setattr(sop, "_method_symbol", ms)
                 return ms.type, ms
             self.error("E301", f"Miembro '{member}' no existe en {cur_type}", sop)
             return None, None
@@ -564,26 +562,22 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         exprs = ctx.expression()
         elems = [self.visit(e) for e in (exprs or [])]
         if not elems:
-            return ArrayType(NULL)
+            return create_array_type(NULL)
         first = elems[0]
         for e in elems[1:]:
             if e != first:
                 self.error("E101", "Array con tipos heterogéneos", ctx)
-                return ArrayType(first)
-        return ArrayType(first)
+                return create_array_type(first)
+        return create_array_type(first)
 
     # -------------------- helpers numéricos --------------------
 
     def _is_numeric(self, t: Optional[Type]) -> bool:
-        return t in (INT, FLOAT)
+        return t in _NUMERIC
 
     def _num_result(self, a: Optional[Type], b: Optional[Type]) -> Optional[Type]:
         # Int op Int -> Int; cualquier mezcla con Float -> Float; otros -> None
-        if a == INT and b == INT:
-            return INT
-        if a in (INT, FLOAT) and b in (INT, FLOAT):
-            return FLOAT
-        return None
+        return _NUM_RESULT.get((a, b))
 
     # -------------------- unarios / binarios / lógicos / condicional --------------------
 
@@ -693,7 +687,7 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
         brackets = txt.count("[]")
         typ: Type = base or NULL
         for _ in range(brackets):
-            typ = ArrayType(typ)
+            typ = create_array_type(typ)
         return typ
 
     def _read_base_type(self, bctx: Optional[CompiscriptParser.BaseTypeContext]) -> Optional[Type]:
@@ -743,7 +737,41 @@ class CompiscriptSemanticVisitor(CompiscriptVisitor):
 # Facade
 # ---------------------------------------------------------------------
 
+# Resultados por árbol: el árbol no cambia tras el parseo, así que analizar el mismo árbol da el mismo resultado
+# (p. ej. el IDE vuelve a analizar el árbol que devuelve la caché de parser_builder). Se libera junto con el árbol.
+# Se guarda una copia inmutable (solo tuplas) y cada llamada recibe listas y diccionarios nuevos: si un llamador
+# modifica su resultado, no altera lo que reciben los demás.
+_RESULTS: "WeakKeyDictionary[ParserRuleContext, tuple]" = WeakKeyDictionary()
+
+def _freeze(symbols: list, errors: list) -> tuple:
+    frozen_symbols = tuple(
+        (scope["scope"], tuple((e["name"], e["kind"], e["type"]) for e in scope["entries"]))
+        for scope in symbols
+    )
+    frozen_errors = tuple(
+        (e["phase"], e["code"], e["message"], e["line"], e["col"], tuple(e["extra"].items()))
+        for e in errors
+    )
+    return frozen_symbols, frozen_errors
+
+def _thaw(snapshot: tuple) -> dict:
+    frozen_symbols, frozen_errors = snapshot
+    return {
+        "symbols": [
+            {"scope": label, "entries": [{"name": n, "kind": k, "type": t} for n, k, t in entries]}
+            for label, entries in frozen_symbols
+        ],
+        "errors": [
+            {"phase": phase, "code": code, "message": message, "line": line, "col": col, "extra": dict(extra)}
+            for phase, code, message, line, col, extra in frozen_errors
+        ],
+    }
+
 def analyze(tree) -> dict:
-    checker = CompiscriptSemanticVisitor()
-    checker.visit(tree)
-    return {"symbols": checker.symtab.dump(), "errors": checker.diag.to_list()}
+    snapshot = _RESULTS.get(tree)
+    if snapshot is None:
+        checker = CompiscriptSemanticVisitor()
+        checker.visit(tree)
+        snapshot = _freeze(checker.symtab.dump(), checker.diag.to_list())
+        _RESULTS[tree] = snapshot
+    return _thaw(snapshot)
@@ -1,9 +1,9 @@
 from __future__ import annotations  # Permite la anotación de tipo en el mismo archivo antes de Python 3.10.
-from dataclasses import dataclass, asdict  # Utiliza `dataclass` para crear clases con atributos fáciles de gestionar.
+from dataclasses import dataclass  # Utiliza `dataclass` para crear clases con atributos fáciles de gestionar.
 from typing import List, Dict, Any  # Importa tipos para manejo de listas, diccionarios y cualquier tipo.
 
 # Clase que representa un diagnóstico de un error durante el análisis (sintáctico o semántico).
-@dataclass
+@dataclass(slots=True)
 class Diagnostic:
     phase: str      # Fase en la que ocurrió el error: 'semantic' o 'syntax'
     code: str       # Código del error, por ejemplo, 'E001', 'E101', etc.
@@ -13,8 +13,14 @@ class Diagnostic:
     extra: Dict[str, Any]  # Información adicional, como datos extra relacionados al error.
 
     # Convierte el objeto `Diagnostic` en un diccionario. Útil para la serialización.
+    # Se construye directamente (sin `asdict`, que recorre y copia recursivamente cada campo);
+    # `extra` solo contiene valores simples, así que basta con una copia superficial.
     def to_dict(self):
-        return asdict(self)
+        return {"phase": self.phase, "code": self.code, "message": self.message,
+                "line": self.line, "col": self.col, "extra": dict(self.extra)}
+
+# `extra` compartido por los diagnósticos sin información adicional (no debe modificarse; `to_dict` lo copia).
+_NO_EXTRA: Dict[str, Any] = {}
 
 # Clase que gestiona una colección de diagnósticos (errores).
 class Diagnostics:
@@ -23,8 +29,13 @@ class Diagnostics:
 
     # Añade un nuevo diagnóstico a la lista.
     # Se le pasa como argumento la fase del error ('semantic' o 'syntax'), el código, el mensaje, y la posición del error.
-    def add(self, *, phase: str, code: str, message: str, line: int, col: int, **extra):
-        self._items.append(Diagnostic(phase=phase, code=code, message=message, line=line, col=col, extra=extra))
+    # Es el caso común, así que no recibe `**extra` (evita crear un diccionario por llamada).
+    def add(self, phase: str, code: str, message: str, line: int, col: int):
+        self._items.append(Diagnostic(phase, code, message, line, col, _NO_EXTRA))
+
+    # Igual que `add`, pero con información adicional (ej. el nombre del símbolo involucrado).
+    def add_extra(self, phase: str, code: str, message: str, line: int, col: int, extra: Dict[str, Any]):
+        self._items.append(Diagnostic(phase, code, message, line, col, extra))
 
     # Extiende la lista de errores con otro objeto `Diagnostics`.
     def extend(self, ds: "Diagnostics"):
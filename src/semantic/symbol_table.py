@@ -1,6 +1,6 @@
 from __future__ import annotations  # Permite las anotaciones de tipo en el mismo archivo antes de Python 3.10.
 from dataclasses import dataclass, field  # Utiliza `dataclass` para crear clases fáciles de gestionar.
-from typing import Dict, Optional, List  # Importa tipos de datos como diccionarios, listas y opcionales.
+from typing import Dict, Optional, List, Tuple  # Importa tipos de datos como diccionarios, listas, tuplas y opcionales.
 from .symbols import Symbol  # Importa la clase `Symbol`, que se utiliza para representar los símbolos en la tabla.
 
 # Define el tipo de un alcance (scope), que puede ser 'GLOBAL', 'FUNCTION', 'CLASS', o 'BLOCK'.
@@ -13,6 +13,15 @@ class Scope:
     name: str = ""   # Nombre del alcance (puede ser vacío, como en el caso del global)
     parent: Optional["Scope"] = None  # El alcance padre, si lo hay. Esto permite crear jerarquías de scopes.
     symbols: Dict[str, Symbol] = field(default_factory=dict)  # Diccionario de símbolos definidos en este alcance.
+    # Diccionarios de símbolos de este scope y de todos sus ancestros, del más interno al global.
+    _chain: Tuple[Dict[str, Symbol], ...] = field(init=False, repr=False, compare=False)
+    # Etiqueta del scope para `SymbolTable.dump` (ej. 'FUNCTION foo'), calculada una sola vez.
+    label: str = field(init=False, repr=False, compare=False)
+
+    # Calcula la cadena de búsqueda y la etiqueta al crear el scope (ni los padres ni el nombre cambian después).
+    def __post_init__(self):
+        self._chain = (self.symbols,) + (self.parent._chain if self.parent else ())
+        self.label = f"{self.kind} {self.name}".strip()
 
     # Define un nuevo símbolo en este alcance.
     def define(self, sym: Symbol):
@@ -24,13 +33,12 @@ class Scope:
 
     # Resuelve un nombre de símbolo en el alcance actual y sus padres.
     def resolve(self, name: str) -> Optional[Symbol]:
-        cur: Optional[Scope] = self
-        # Recorre los scopes desde el actual hasta el global (si existe).
-        while cur:
-            if name in cur.symbols:
+        # Recorre los diccionarios desde el scope actual hasta el global, sin subir por `parent`.
+        for symbols in self._chain:
+            sym = symbols.get(name)
+            if sym is not None:
                 # Si encuentra el símbolo, lo devuelve.
-                return cur.symbols[name]
-            cur = cur.parent  # Si no lo encuentra, sube al scope padre.
+                return sym
         return None  # Si no encuentra el símbolo en ninguno de los scopes, devuelve None.
 
 # Clase que representa la tabla de símbolos global de todo el programa.
@@ -62,9 +70,9 @@ class SymbolTable:
     def dump(self) -> list:
         out = []
         for s in self._stack:
-            # Para cada scope en el stack, genera un diccionario con su tipo, nombre y sus símbolos.
+            # Para cada scope en el stack, genera un diccionario con su etiqueta (precalculada) y sus símbolos.
             out.append({
-                "scope": f"{s.kind} {s.name}".strip(),
+                "scope": s.label,
                 "entries": [
                     {"name": k, "kind": v.kind, "type": str(v.type)}
                     for k, v in s.symbols.items()
@@ -4,31 +4,31 @@ from typing import List, Dict, Optional  # Importa tipos como listas, diccionari
 from .types import Type  # Importa el tipo `Type` desde otro archivo, el cual probablemente define los tipos posibles como `int`, `str`, etc.
 
 # Definición de la clase base para representar cualquier tipo de símbolo (variable, función, clase, etc.).
-@dataclass
+@dataclass(slots=True)
 class Symbol:
     name: str  # Nombre del símbolo (ej. 'x' para una variable, 'foo' para una función).
     type: Type  # Tipo del símbolo (puede ser `int`, `float`, `string`, etc.).
     kind: str = field(default="", init=False)  # Tipo de símbolo (por ejemplo, 'var' para variable, 'func' para función).
 
 # Clase para representar un símbolo de variable, que hereda de `Symbol`.
-@dataclass
+@dataclass(slots=True)
 class VariableSymbol(Symbol):
     is_const: bool = False  # Indica si la variable es constante.
     kind: str = field(default="var", init=False)  # El tipo de símbolo es 'var' para variables.
 
 # Clase para representar un símbolo de parámetro de función, que también hereda de `Symbol`.
-@dataclass
+@dataclass(slots=True)
 class ParamSymbol(Symbol):
     kind: str = field(default="param", init=False)  # El tipo de símbolo es 'param' para parámetros de funciones.
 
 # Clase para representar un símbolo de función, que hereda de `Symbol`.
-@dataclass
+@dataclass(slots=True)
 class FunctionSymbol(Symbol):
     params: List[ParamSymbol] = field(default_factory=list)  # Lista de parámetros de la función.
     kind: str = field(default="func", init=False)  # El tipo de símbolo es 'func' para funciones.
 
 # Clase para representar un símbolo de clase, que hereda de `Symbol`.
-@dataclass
+@dataclass(slots=True)
 class ClassSymbol(Symbol):
     fields: Dict[str, Symbol] = field(default_factory=dict)  # Diccionario de campos (variables) de la clase.
     methods: Dict[str, FunctionSymbol] = field(default_factory=dict)  # Diccionario de métodos (funciones) de la clase.
@@ -1,14 +1,15 @@
 from __future__ import annotations  # Permite usar anotaciones de tipo hacia adelante (por ejemplo, clases que se refieren a sí mismas).
-from dataclasses import dataclass  # Usamos `dataclass` para generar clases de manera más sencilla y estructurada.
+from dataclasses import dataclass, field  # Usamos `dataclass` para generar clases de manera más sencilla y estructurada.
 from typing import Optional, Dict  # Importa los tipos `Optional` y `Dict` para tipos más flexibles.
+from weakref import WeakValueDictionary  # Caché de tipos arreglo que no impide liberarlos.
 
 # Clase base para representar los tipos. Los tipos se definen como clases hijas de esta.
 class Type:
+    __slots__ = ()  # Sin `__dict__` por instancia: cada subclase declara solo los atributos que necesita.
     name: str = "<type>"  # Nombre del tipo, se establece por defecto a "<type>".
 
-    # Método para comparar si dos tipos son iguales
-    def __eq__(self, other):
-        return isinstance(other, Type) and self.name == other.name
+    # Igualdad y hash: los primitivos son instancias únicas (ver abajo), así que se comparan por identidad
+    # (`__eq__`/`__hash__` de `object`); `ArrayType` y `ClassType` definen su propia igualdad estructural.
 
     # Método para mostrar una representación del tipo como cadena
     def __str__(self):
@@ -16,39 +17,53 @@ class Type:
 
 
 # Tipos primitivos derivados de la clase base `Type`.
-class IntType(Type):    name = "Int"    # Tipo de datos entero.
-class FloatType(Type):  name = "Float"  # Tipo de datos con punto flotante.
-class BoolType(Type):   name = "Bool"   # Tipo de datos booleano.
-class StringType(Type): name = "String" # Tipo de datos cadena de texto.
-class NullType(Type):   name = "Null"   # Tipo nulo, usado para representar la ausencia de valor.
-class VoidType(Type):   name = "Void"   # Tipo vacío, usado principalmente para funciones que no devuelven valor.
+class IntType(Type):    __slots__ = (); name = "Int"    # Tipo de datos entero.
+class FloatType(Type):  __slots__ = (); name = "Float"  # Tipo de datos con punto flotante.
+class BoolType(Type):   __slots__ = (); name = "Bool"   # Tipo de datos booleano.
+class StringType(Type): __slots__ = (); name = "String" # Tipo de datos cadena de texto.
+class NullType(Type):   __slots__ = (); name = "Null"   # Tipo nulo, usado para representar la ausencia de valor.
+class VoidType(Type):   __slots__ = (); name = "Void"   # Tipo vacío, usado principalmente para funciones que no devuelven valor.
 
 
 # Clase que representa un tipo de arreglo, que contiene un tipo de elemento.
-@dataclass(frozen=True)  # Usamos `frozen=True` para que esta clase sea inmutable (una vez creada no puede modificarse).
+# Escrita a mano (sin `dataclass(frozen=True)`): el constructor asigna directo a los slots y el hash se calcula una vez.
 class ArrayType(Type):
-    elem: Type  # Tipo de los elementos del arreglo.
+    __slots__ = ("elem", "name", "_hash", "__weakref__")  # `__weakref__` para poder vivir en `_ARRAY_TYPES`.
+
+    def __init__(self, elem: Type):
+        self.elem = elem  # Tipo de los elementos del arreglo.
+        self.name = f"Array<{elem}>"  # Nombre del tipo, p.ej., "Array<Int>" (se calcula una vez).
+        self._hash = hash(("Array", elem))  # Hash precalculado; el tipo no se modifica después de construirse.
+
+    def __eq__(self, other):
+        # Igualdad estructural: dos arreglos son iguales si sus tipos de elemento lo son.
+        return other.__class__ is ArrayType and (other.elem is self.elem or other.elem == self.elem)
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"ArrayType(elem={self.elem!r})"
 
     def __str__(self):
         return f"[{self.elem}]"  # Representación en cadena de un arreglo con el tipo de sus elementos.
 
-    @property
-    def name(self):
-        return f"Array<{self.elem}>"  # Nombre del tipo, p.ej., "Array<Int>".
-
 
 # Clase que representa un tipo de clase personalizada, que contiene un nombre de clase y sus miembros.
-@dataclass  # Usamos `dataclass` porque esta clase tiene datos asociados (nombre de clase y miembros).
+@dataclass(slots=True)  # Usamos `dataclass` porque esta clase tiene datos asociados (nombre de clase y miembros).
 class ClassType(Type):
     class_name: str  # Nombre de la clase.
     members: Dict[str, Type]  # Miembros de la clase, representados por un diccionario de nombre -> tipo.
+    name: str = field(init=False, repr=False, compare=False)  # El nombre del tipo es el nombre de la clase en sí.
+
+    def __post_init__(self):
+        self.name = self.class_name
 
     def __str__(self):
         return self.class_name  # Representación de la clase como su nombre.
 
-    @property
-    def name(self):
-        return self.class_name  # El nombre de la clase es el nombre de la clase en sí.
+    def __hash__(self):
+        return hash(self.class_name)  # `dataclass` no genera hash para clases mutables; usamos el nombre.
 
 
 # Instancias singleton de los tipos primitivos, para evitar crear múltiples instancias del mismo tipo.
@@ -58,3 +73,28 @@ BOOL   = BoolType()   # Instancia del tipo Bool.
 STR    = StringType() # Instancia del tipo String.
 NULL   = NullType()   # Instancia del tipo Null.
 VOID   = VoidType()   # Instancia del tipo Void.
+
+
+# Tipos arreglo ya construidos, por tipo de elemento. Referencias débiles: un tipo que nadie usa se libera.
+_ARRAY_TYPES: "WeakValueDictionary[Type, ArrayType]" = WeakValueDictionary()
+
+# Construye (una sola vez por tipo de elemento) el tipo arreglo; llamadas repetidas devuelven la misma instancia.
+def create_array_type(elem: Type) -> ArrayType:
+    t = _ARRAY_TYPES.get(elem)
+    if t is None:
+        t = _ARRAY_TYPES[elem] = ArrayType(elem)
+    return t
+
+
+# Predicados sobre la representación etiquetada: basta con revisar la clase del tipo (sin manipular cadenas).
+def is_array(t: Optional[Type]) -> bool:
+    return type(t) is ArrayType  # True si `t` es un tipo arreglo.
+
+def is_class(t: Optional[Type]) -> bool:
+    return type(t) is ClassType  # True si `t` es un tipo clase.
+
+def get_array_element_type(t: Optional[Type]) -> Optional[Type]:
+    return t.elem if type(t) is ArrayType else None  # Tipo de los elementos, o None si no es arreglo.
+
+def get_class_name(t: Optional[Type]) -> Optional[str]:
+    return t.class_name if type(t) is ClassType else None  # Nombre de la clase, o None si no es clase.
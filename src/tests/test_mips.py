@@ -0,0 +1,438 @@
+# src/tests/test_mips.py
+import re
+import pytest
+from mips.mips_generator import MIPSGenerator, QuadrupleList, QuadOp as Q
+from mips.register_manager import RegisterManager
+
+# Subconjunto de MIPS que emite el generador, para ejecutar el .asm en las pruebas
+_COMPARE = {
+    "slt": lambda a, b: a < b, "slti": lambda a, b: a < b, "sle": lambda a, b: a <= b,
+    "sge": lambda a, b: a >= b, "seq": lambda a, b: a == b, "sne": lambda a, b: a != b,
+}
+_BRANCH = {
+    "beq": lambda a, b: a == b, "bne": lambda a, b: a != b, "blt": lambda a, b: a < b,
+    "ble": lambda a, b: a <= b, "bgt": lambda a, b: a > b, "bge": lambda a, b: a >= b,
+}
+
+
+def _to32(value):
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def _div(a, b):
+    quotient = abs(a) // abs(b)
+    return quotient if (a >= 0) == (b >= 0) else -quotient
+
+
+def run(asm, max_steps=100000):
+    """Ejecuta el programa y retorna lo que imprime (print_int y print_string)."""
+    memory, strings, labels, text = {}, {}, {}, []
+    address, section = 0x10010000, None
+    for raw in asm.split("\n"):
+        line = raw.strip()
+        if not line or line.startswith("#") or line.startswith(".globl"):
+            continue
+        if line in (".data", ".text"):
+            section = line
+            continue
+        if section == ".data":
+            label, directive, value = re.match(r'(\w+): \.(\w+) ?(.*)', line).groups()
+            labels[label] = address
+            if directive == "asciiz":
+                strings[address] = value[1:-1].replace("\\n", "\n")
+            else:
+                memory[address] = int(value or 0)
+            address += 4 * (len(value) + 1)
+        elif line.endswith(":"):
+            labels[line[:-1]] = len(text)
+        else:
+            op, _, args = line.partition(" ")
+            text.append((op, [arg.strip() for arg in args.split(",")] if args else []))
+
+    regs = {"$zero": 0, "$sp": 0x7FFFEFFC}
+    hi = lo = 0
+    out = []
+    value = lambda x: regs.get(x, 0) if x.startswith("$") else int(x)
+
+    def write(reg, result):
+        if reg != "$zero":
+            regs[reg] = _to32(result)
+
+    def addr(x):
+        offset = re.match(r'(-?\d*)\((\$\w+)\)$', x)
+        if offset:
+            return int(offset.group(1) or 0) + regs.get(offset.group(2), 0)
+        return labels[x]
+
+    pc = labels["main"]
+    for _ in range(max_steps):
+        if pc >= len(text):
+            break
+        op, a = text[pc]
+        pc += 1
+        if op == "li": write(a[0], int(a[1]))
+        elif op == "la": write(a[0], labels[a[1]])
+        elif op == "move": write(a[0], value(a[1]))
+        elif op in ("add", "addi"): write(a[0], value(a[1]) + value(a[2]))
+        elif op == "sub": write(a[0], value(a[1]) - value(a[2]))
+        elif op == "mul": write(a[0], value(a[1]) * value(a[2]))
+        elif op == "div" and len(a) == 3: write(a[0], _div(value(a[1]), value(a[2])))
+        elif op == "div":
+            lo = _div(value(a[0]), value(a[1]))
+            hi = value(a[0]) - lo * value(a[1])
+        elif op == "mfhi": write(a[0], hi)
+        elif op == "mflo": write(a[0], lo)
+        elif op == "neg": write(a[0], -value(a[1]))
+        elif op in ("and", "andi"): write(a[0], value(a[1]) & value(a[2]))
+        elif op in ("or", "ori"): write(a[0], value(a[1]) | value(a[2]))
+        elif op in ("xor", "xori"): write(a[0], value(a[1]) ^ value(a[2]))
+        elif op in _COMPARE: write(a[0], int(_COMPARE[op](value(a[1]), value(a[2]))))
+        elif op == "sll": write(a[0], value(a[1]) << int(a[2]))
+        elif op == "sra": write(a[0], value(a[1]) >> int(a[2]))
+        elif op == "srl": write(a[0], (value(a[1]) & 0xFFFFFFFF) >> int(a[2]))
+        elif op == "j": pc = labels[a[0]]
+        elif op == "jal": write("$ra", pc); pc = labels[a[0]]
+        elif op == "jr": pc = value(a[0])
+        elif op == "beqz": pc = labels[a[1]] if value(a[0]) == 0 else pc
+        elif op == "bnez": pc = labels[a[1]] if value(a[0]) != 0 else pc
+        elif op in _BRANCH: pc = labels[a[2]] if _BRANCH[op](value(a[0]), value(a[1])) else pc
+        elif op == "lw": write(a[0], memory.get(addr(a[1]), 0))
+        elif op == "sw": memory[addr(a[1])] = value(a[0])
+        elif op == "syscall":
+            service = regs.get("$v0")
+            if service == 10:
+                break
+            out.append(str(regs["$a0"]) if service == 1 else strings[regs["$a0"]])
+        else:
+            raise ValueError(f"instrucción no soportada: {op}")
+    else:
+        raise RuntimeError("el programa no terminó")
+    return "".join(out)
+
+
+def generate(*quads):
+    quadruples = QuadrupleList()
+    for quad in quads:
+        quadruples.add(*quad)
+    return MIPSGenerator().generate(quadruples)
+
+
+def printed(*values):
+    return "".join(f"{value}\n" for value in values)
+
+
+# Más temporales vivos a la vez que registros $t: obliga a hacer spill
+def _pressure(source, count, first):
+    """Define count temporales (source / k) y retorna (cuádruplos, nombres)."""
+    names = [f"t{first + k}" for k in range(count)]
+    return [(Q.DIV, source, str(k + 3), name) for k, name in enumerate(names)], names
+
+
+def _sum(names, first):
+    """Suma los temporales de names en cadena; retorna (cuádruplos, temporal final)."""
+    quads, acc = [], names[0]
+    for k, name in enumerate(names[1:]):
+        quads.append((Q.ADD, acc, name, f"t{first + k}"))
+        acc = f"t{first + k}"
+    return quads, acc
+
+
+def test_spill_inside_loop():
+    # t0 cruza el ciclo; el cuerpo hace spill y en la siguiente iteración Ltop debe leerlo bien
+    body, names = _pressure("i", 11, 1)
+    total, acc = _sum(names, 20)
+    asm = generate(
+        (Q.ASSIGN, "100", None, "n"),
+        (Q.DIV, "n", "7", "t0"),
+        (Q.ASSIGN, "0", None, "i"),
+        (Q.LABEL, "Ltop"),
+        (Q.PRINT, "t0"),
+        *body, *total,
+        (Q.PRINT, acc),
+        (Q.ADD, "i", "1", "t40"), (Q.ASSIGN, "t40", None, "i"),
+        (Q.LT, "i", "3", "t41"), (Q.IF_TRUE, "t41", "Ltop"),
+    )
+    assert "spill_" in asm
+    expected = [v for i in range(3) for v in (14, sum(i // (k + 3) for k in range(11)))]
+    assert run(asm) == printed(*expected)
+
+
+@pytest.mark.parametrize("cond", ["0", "1"], ids=["salta", "no_salta"])
+def test_spill_inside_branch(cond):
+    # El spill ocurre solo en el bloque then; tras Lskip ambos caminos deben ver los mismos valores
+    live, names = _pressure("n", 11, 0)
+    total, acc = _sum(names, 30)
+    asm = generate(
+        (Q.ASSIGN, "50", None, "n"), (Q.ASSIGN, cond, None, "c"),
+        *live,
+        (Q.IF_FALSE, "c", "Lskip"),
+        (Q.DIV, "n", "13", "t20"), (Q.PRINT, "t20"),
+        (Q.LABEL, "Lskip"),
+        *total,
+        (Q.PRINT, acc),
+    )
+    assert "spill_" in asm
+    expected = ([50 // 13] if cond == "1" else []) + [sum(50 // (k + 3) for k in range(11))]
+    assert run(asm) == printed(*expected)
+
+
+def test_next_use_after_back_edge():
+    # t0 se lee en la cabeza del ciclo (índice 4) y su rango se extendió hasta el salto (20)
+    rm = RegisterManager()
+    rm.uses.update({"t0": [4], "t1": [12]})
+    rm.live_end.update({"t0": 20, "t1": 12})
+    rm.loop_heads["t0"] = 3
+    rm.index = 10
+    assert rm._next_use("t1") == 12
+    assert rm._next_use("t0") == 20 + 1 + (4 - 3)  # siguiente iteración, no infinito
+    rm.index = 21
+    assert rm._next_use("t0") == float('inf')      # ya salió del ciclo
+
+
+@pytest.mark.parametrize("cond", ["0", "1"], ids=["else", "then"])
+def test_spill_slot_across_merge(cond):
+    # v8/v9 no caben en $s0-$s7; el then solo recarga v9 y el else la redefine.
+    # Tras la etiqueta de cierre un nuevo spill de v9 no puede confiar en el slot del then
+    variables = [(Q.ASSIGN, str(k + 1), None, f"v{k}") for k in range(10)]
+    live, names = _pressure("v0", 11, 0)
+    total, acc = _sum(names, 30)
+    asm = generate(
+        *variables, (Q.ASSIGN, cond, None, "c"),
+        *live,
+        (Q.IF_FALSE, "c", "Lelse"),
+        (Q.PRINT, "v9"),
+        (Q.GOTO, "Lend"),
+        (Q.LABEL, "Lelse"),
+        (Q.ADD, "v9", "100", "t50"), (Q.ASSIGN, "t50", None, "v9"),
+        (Q.LABEL, "Lend"),
+        *_pressure("v8", 11, 60)[0],
+        *total,
+        (Q.PRINT, acc), (Q.PRINT, "v9"),
+    )
+    assert "spill_" in asm
+    expected = ([10] if cond == "1" else []) + [sum(1 // (k + 3) for k in range(11))]
+    assert run(asm) == printed(*expected, 10 if cond == "1" else 110)
+
+
+def quadruples(*quads):
+    result = QuadrupleList()
+    for quad in quads:
+        result.add(*quad)
+    return result
+
+
+def shape(quads):
+    return [(quad.op, quad.arg1, quad.arg2, quad.result) for quad in quads]
+
+
+def opcodes(asm):
+    """Mnemónicos de la sección .text (sin etiquetas ni directivas)."""
+    text = asm.split(".text", 1)[1]
+    return [line.split(" ", 1)[0] for line in text.split("\n")
+            if line and line[0] not in ".#" and not line.endswith(":")]
+
+
+# --- Reescrituras sobre cuádruplos ---
+
+def test_layout_jumps():
+    # IF_TRUE sobre un GOTO se invierte; GOTO a la etiqueta siguiente desaparece
+    quads = quadruples(
+        (Q.IF_TRUE, "a", "L1"), (Q.GOTO, "L2"), (Q.LABEL, "L1"), (Q.PRINT, "a"),
+        (Q.LABEL, "L2"), (Q.GOTO, "L3"), (Q.LABEL, "L3"),
+    )
+    assert shape(MIPSGenerator()._layout_jumps(quads)) == [
+        (Q.IF_FALSE, "a", "L2", None), (Q.LABEL, "L1", None, None), (Q.PRINT, "a", None, None),
+        (Q.LABEL, "L2", None, None), (Q.LABEL, "L3", None, None),
+    ]
+
+
+@pytest.mark.parametrize("a", ["0", "5"])
+def test_layout_jumps_runs(a):
+    asm = generate(
+        (Q.ASSIGN, a, None, "a"),
+        (Q.IF_TRUE, "a", "L1"), (Q.GOTO, "L2"), (Q.LABEL, "L1"), (Q.PRINT, "a"), (Q.LABEL, "L2"),
+    )
+    assert "j" not in opcodes(asm)
+    assert run(asm) == ("" if a == "0" else printed(5))
+
+
+def test_common_subexpressions():
+    # b * a reutiliza a * b (conmutativa); tras redefinir a se vuelve a calcular
+    quads = MIPSGenerator()._eliminate_common_subexpressions(quadruples(
+        (Q.MUL, "a", "b", "t0"), (Q.MUL, "b", "a", "t1"),
+        (Q.ASSIGN, "1", None, "a"), (Q.MUL, "a", "b", "t2"),
+    ))
+    assert shape(quads)[1] == (Q.ASSIGN, "t0", None, "t1")
+    assert shape(quads)[3] == (Q.MUL, "a", "b", "t2")
+
+
+def test_common_subexpressions_stop_at_labels():
+    quads = MIPSGenerator()._eliminate_common_subexpressions(quadruples(
+        (Q.ADD, "a", "b", "t0"), (Q.LABEL, "L1"), (Q.ADD, "a", "b", "t1"),
+    ))
+    assert shape(quads)[2] == (Q.ADD, "a", "b", "t1")
+
+
+def test_dead_code():
+    # t1 no se lee, y al quitarlo t0 tampoco; DIV se conserva (puede dividir entre cero)
+    quads = MIPSGenerator()._eliminate_dead_code(list(quadruples(
+        (Q.MUL, "a", "a", "t0"), (Q.ADD, "t0", "1", "t1"),
+        (Q.DIV, "a", "b", "t2"), (Q.PRINT, "a"),
+    )))
+    assert [quad.op for quad in quads] == [Q.DIV, Q.PRINT]
+
+
+def test_sink_definitions():
+    # La definición baja hasta su uso, pero no más allá de una redefinición de su operando
+    quads = MIPSGenerator()._sink_definitions(quadruples(
+        (Q.MUL, "a", "3", "t0"), (Q.ADD, "b", "1", "t1"), (Q.PRINT, "b"),
+        (Q.ASSIGN, "7", None, "a"), (Q.PRINT, "t1"), (Q.PRINT, "t0"),
+    ))
+    assert [quad.op for quad in quads] == [Q.PRINT, Q.MUL, Q.ASSIGN, Q.ADD, Q.PRINT, Q.PRINT]
+
+
+def test_sink_definitions_stop_at_block_end():
+    quads = MIPSGenerator()._sink_definitions(quadruples(
+        (Q.ADD, "a", "1", "t0"), (Q.LABEL, "L1"), (Q.PRINT, "t0"),
+    ))
+    assert [quad.op for quad in quads] == [Q.ADD, Q.LABEL, Q.PRINT]
+
+
+# --- Traducción ---
+
+def test_constant_folding():
+    asm = generate(
+        (Q.ADD, "2", "3", "t0"), (Q.MUL, "t0", "4", "t1"), (Q.PRINT, "t1"),
+        (Q.MUL, "65536", "65536", "t2"), (Q.PRINT, "t2"),      # se trunca a 32 bits
+        (Q.DIV, "-7", "2", "t3"), (Q.PRINT, "t3"),             # trunca hacia cero
+    )
+    assert not {"add", "mul", "div", "sll", "sra"} & set(opcodes(asm))
+    assert run(asm) == printed(20, 0, -3)
+
+
+def test_constant_propagation_forgets_at_labels():
+    # Tras la etiqueta t0 puede venir de otro camino: se lee del registro
+    asm = generate(
+        (Q.ASSIGN, "0", None, "i"), (Q.ASSIGN, "5", None, "t0"),
+        (Q.LABEL, "L1"), (Q.PRINT, "t0"), (Q.ADD, "t0", "1", "t1"), (Q.ASSIGN, "t1", None, "t0"),
+        (Q.ADD, "i", "1", "t2"), (Q.ASSIGN, "t2", None, "i"),
+        (Q.LT, "i", "2", "t3"), (Q.IF_TRUE, "t3", "L1"),
+    )
+    assert run(asm) == printed(5, 6)
+
+
+def test_division_by_zero_literal_not_folded():
+    asm = generate((Q.ASSIGN, "1", None, "a"), (Q.DIV, "a", "0", "t0"), (Q.PRINT, "t0"))
+    assert "div" in opcodes(asm)
+
+
+def test_immediate_forms():
+    asm = generate(
+        (Q.ASSIGN, "5", None, "a"),
+        (Q.ADD, "a", "10", "t0"), (Q.PRINT, "t0"),
+        (Q.SUB, "a", "10", "t1"), (Q.PRINT, "t1"),
+        (Q.LT, "a", "9", "t2"), (Q.PRINT, "t2"),
+        (Q.GE, "a", "5", "t3"), (Q.PRINT, "t3"),   # !(a < 5): slti + xori
+    )
+    assert opcodes(asm).count("addi") == 2
+    assert opcodes(asm).count("slti") == 2 and "xori" in opcodes(asm)
+    assert run(asm) == printed(15, -5, 1, 1)
+
+
+@pytest.mark.parametrize("a", ["32766", "32767", "32768", "-32768", "-32769"])
+@pytest.mark.parametrize("op", [Q.LT, Q.LE, Q.GT, Q.GE])
+def test_compare_immediate_boundary(op, a):
+    # LE/GT con 32767 necesitan C + 1 = 32768, que no cabe en 16 bits: no se usa slti
+    expected = {Q.LT: int(a) < 32767, Q.LE: int(a) <= 32767, Q.GT: int(a) > 32767, Q.GE: int(a) >= 32767}
+    expected_low = {Q.LT: int(a) < -32768, Q.LE: int(a) <= -32768, Q.GT: int(a) > -32768, Q.GE: int(a) >= -32768}
+    asm = generate(
+        (Q.ASSIGN, a, None, "a"),
+        (op, "a", "32767", "t0"), (Q.PRINT, "t0"),
+        (op, "a", "-32768", "t1"), (Q.PRINT, "t1"),
+    )
+    if op in (Q.LE, Q.GT):
+        assert "slti $t0, $s0, 32768" not in asm
+    assert run(asm) == printed(int(expected[op]), int(expected_low[op]))
+
+
+@pytest.mark.parametrize("dividend", [-9, -8, -7, -1, 0, 1, 7, 8, 9, -2147483648, 2147483647])
+@pytest.mark.parametrize("divisor", [1, 2, 4, 8, 65536])
+def test_power_of_two_div_mod(divisor, dividend):
+    # sra/andi redondean hacia -infinito; div/rem de MIPS truncan hacia cero (resto con el signo del dividendo)
+    asm = generate(
+        (Q.ASSIGN, str(dividend), None, "a"),
+        (Q.DIV, "a", str(divisor), "t0"), (Q.PRINT, "t0"),
+        (Q.MOD, "a", str(divisor), "t1"), (Q.PRINT, "t1"),
+        (Q.MUL, "a", str(divisor), "t2"), (Q.PRINT, "t2"),
+    )
+    assert "div" not in opcodes(asm) and "mul" not in opcodes(asm)
+    quotient = _div(dividend, divisor)
+    assert run(asm) == printed(quotient, dividend - quotient * divisor, _to32(dividend * divisor))
+
+
+@pytest.mark.parametrize("divisor", [2147483648, 4294967296])
+def test_power_of_two_out_of_shift_range(divisor):
+    # 2^31 es negativo en 32 bits y 2^32 pediría sll/sra de 32: se usan div y mul
+    asm = generate(
+        (Q.ASSIGN, "-7", None, "a"),
+        (Q.DIV, "a", str(divisor), "t0"), (Q.PRINT, "t0"),
+        (Q.MUL, "a", str(divisor), "t1"), (Q.PRINT, "t1"),
+    )
+    assert {"div", "mul"} <= set(opcodes(asm))
+    assert not {"sll", "sra", "srl"} & set(opcodes(asm))
+    if divisor == 2147483648:
+        assert run(asm) == printed(_div(-7, _to32(divisor)), _to32(-7 * divisor))
+
+
+@pytest.mark.parametrize("a", ["3", "9"])
+def test_branch_fusion(a):
+    asm = generate(
+        (Q.ASSIGN, a, None, "a"),
+        (Q.LT, "a", "9", "t0"), (Q.IF_FALSE, "t0", "L1"), (Q.PRINT, "a"), (Q.LABEL, "L1"),
+    )
+    assert "bge $s0, 9, L1" in asm
+    assert not {"slt", "slti", "beqz"} & set(opcodes(asm))
+    assert run(asm) == (printed(3) if a == "3" else "")
+
+
+def test_branch_not_fused_when_result_is_read_again():
+    asm = generate(
+        (Q.ASSIGN, "3", None, "a"),
+        (Q.LT, "a", "9", "t0"), (Q.IF_FALSE, "t0", "L1"), (Q.PRINT, "t0"), (Q.LABEL, "L1"),
+    )
+    assert "beqz" in opcodes(asm)
+    assert run(asm) == printed(1)
+
+
+# --- Peephole ---
+
+def peephole(*lines):
+    generator = MIPSGenerator()
+    generator.code[:] = lines
+    generator._peephole_pass()
+    return generator.code
+
+
+@pytest.mark.parametrize("lines, expected", [
+    (["move $t0, $t0"], []),
+    (["add $t1, $t2, $zero"], ["move $t1, $t2"]),
+    (["addi $t1, $t2, 0"], ["move $t1, $t2"]),
+    (["sw $t0, spill_0", "lw $t1, spill_0"], ["sw $t0, spill_0", "move $t1, $t0"]),
+    # El temporal se sobrescribe después: la suma va directo al destino
+    (["add $t0, $s0, $s1", "move $s2, $t0", "li $t0, 1"], ["add $s2, $s0, $s1", "li $t0, 1"]),
+    (["j L1", "L1:"], ["L1:"]),
+], ids=["move_rr", "add_zero", "addi_zero", "sw_lw", "op_move", "jump_next"])
+def test_peephole_rules(lines, expected):
+    assert peephole(*lines) == expected
+
+
+def test_peephole_does_not_cross_labels():
+    # Por el salto a L1 $t0 puede traer otro valor: el move no se fusiona con el li
+    lines = ["li $t0, 5", "L1:", "move $s2, $t0", "li $t0, 1", "bnez $s3, L1"]
+    assert peephole(*lines) == lines
+
+
+def test_peephole_keeps_temporary_that_is_read_later():
+    lines = ["add $t0, $s0, $s1", "move $s2, $t0", "move $a0, $t0"]
+    assert peephole(*lines) == lines
@@ -1,5 +1,6 @@
 # src/tests/test_examples.py
 import os
+import pytest
 from antlr4 import FileStream, CommonTokenStream
 from parsing.antlr.CompiscriptLexer import CompiscriptLexer
 from parsing.antlr.CompiscriptParser import CompiscriptParser
@@ -27,16 +28,30 @@ def compile_file(path):
     tree = parser.program()
     return analyze(tree)
 
-def test_examples_ok():
-    for fname in OK:
-        path = os.path.join(BASE, fname)
-        assert os.path.exists(path), f"No existe {path}"
-        res = compile_file(path)
-        assert res["errors"] == [], f"{fname} no debería dar errores, obtuvo: {res['errors']}"
+# Un caso por archivo: cada archivo falla por separado y `pytest -n auto` (pytest-xdist) los reparte entre núcleos
+@pytest.mark.parametrize("fname", OK, ids=OK)
+def test_examples_ok(fname):
+    path = os.path.join(BASE, fname)
+    assert os.path.exists(path), f"No existe {path}"
+    res = compile_file(path)
+    assert res["errors"] == [], f"{fname} no debería dar errores, obtuvo: {res['errors']}"
 
-def test_examples_fail():
-    for fname in FAIL:
-        path = os.path.join(BASE, fname)
-        assert os.path.exists(path), f"No existe {path}"
-        res = compile_file(path)
-        assert res["errors"], f"{fname} debería dar errores semánticos"
\ No newline at end of file
+@pytest.mark.parametrize("fname", FAIL, ids=FAIL)
+def test_examples_fail(fname):
+    path = os.path.join(BASE, fname)
+    assert os.path.exists(path), f"No existe {path}"
+    res = compile_file(path)
+    assert res["errors"], f"{fname} debería dar errores semánticos"
+
+def test_analyze_returns_independent_copies():
+    from antlr4 import InputStream
+    lexer = CompiscriptLexer(InputStream("let x: integer = true;"))
+    tree = CompiscriptParser(CommonTokenStream(lexer)).program()
+    first = analyze(tree)
+    assert first["errors"]
+    first["errors"][0]["extra"]["mutado"] = True
+    first["errors"].clear()
+    first["symbols"][0]["entries"].clear()
+    second = analyze(tree)
+    assert second["errors"] and "mutado" not in second["errors"][0]["extra"]
+    assert second["symbols"][0]["entries"]